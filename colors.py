@@ -1,5 +1,6 @@
 """A dictionary containing a number of rgb and hex coded color values
 """
+import numpy as np
 
 rgb_dictionary = { 'maroon':               [128,0,0],
         'dark_red':             [139,0,0],
@@ -292,6 +293,13 @@ hex_dictionary = { 'maroon':	    '#800000',
         'white':                    '#FFFFFF'}
 
 
+# Every rgb color as a row of opaque RGBA values. color_index maps a color name to its row so
+# many colors can be gathered from rgb_table at once.
+color_names = tuple(rgb_dictionary)
+color_index = {color: index for index, color in enumerate(color_names)}
+rgb_table = np.array([rgb + [255] for rgb in rgb_dictionary.values()], dtype=np.uint8)
+rgb_table.flags.writeable = False
+
 def get_rgb_color(color, alpha = None):
     """Takes color name and returns a list containing the RGB value for that color
     if alpha value between 0-255 is given it also appends the alpha value
@@ -338,6 +346,62 @@ def get_rgb_color(color, alpha = None):
     return(rgb_dictionary.get(color)+alpha)
 
 
+def get_rgb_array(colors, alphas = None):
+    """Vectorized get_rgb_color. Takes one or more color names and returns their RGBA values
+    gathered from rgb_table. Alpha values are broadcast against the colors, which lets a single
+    color be paired with a whole array of alpha values.
+    Examples:
+    'black' = [0, 0, 0, 255]
+    ['black', 'white'], 200 = [[0, 0, 0, 200], [255, 255, 255, 200]]
+    'black', [0, 100] = [[0, 0, 0, 0], [0, 0, 0, 100]]
+
+    Args:
+        colors (string, list): A color name or a list/array of color names.
+        alphas (int, np.ndarray, optional): 0-255 alpha values. Values outside the range are
+        clipped. Defaults to None which gives fully opaque colors.
+
+    Raises:
+        TypeError: Colors need to be of type string.
+        KeyError: If a color does not excist in the dictionary an error is raised.
+        TypeError: The alpha values need to be integers.
+
+    Returns:
+        np.ndarray: uint8 array of shape (colors and alphas broadcast together, 4).
+    """
+    # Only look up each distinct color name once.
+    names = np.asarray(colors)
+    if names.size > 0 and names.dtype.kind != 'U':
+        # Object arrays are accepted as long as every element is a string.
+        not_strings = [color for color in names.flat if not isinstance(color, str)][:1]
+        if not_strings:
+            raise TypeError(f'color needs to be of type string. Type provided: {type(not_strings[0])}')
+        names = names.astype(str)
+    unique_names, inverse = np.unique(names, return_inverse=True)
+
+    # Find the row of every distinct color.
+    unique_rows = np.empty(len(unique_names), dtype=np.intp)
+    for position, color in enumerate(unique_names):
+        index = color_index.get(color.lower())
+        if index == None:
+            raise KeyError(f'''Tried to fetch the color: {color}. The color
+         does not exist. Please consult the rgb spreadsheet.''')
+        unique_rows[position] = index
+    rows = unique_rows[inverse].reshape(np.shape(colors))
+
+    if alphas is None:
+        return rgb_table[rows]
+
+    alphas = np.asarray(alphas)
+    if not np.issubdtype(alphas.dtype, np.integer):
+        raise TypeError(f'Alpha needs to be of type integer. Type provided: {alphas.dtype}')
+
+    # Pair every color with its alpha value.
+    shape = np.broadcast_shapes(rows.shape, alphas.shape)
+    rgba = rgb_table[np.broadcast_to(rows, shape)]
+    rgba[..., 3] = np.clip(alphas, 0, 255)
+
+    return rgba
+
 def get_hex_color(color, alpha_percent = None):
     """Takes a color name and optionally an alpha value in percentage 0-100.
     Then returns the corresponding color in hexadecimal values. Color names
@@ -0,0 +1,76 @@
+# Process wide registry of the json data in the Data folder. Every file is read and parsed at
+# most once per process and handed out as a read-only view that can be shared between threads.
+import json
+import os
+import threading
+from types import MappingProxyType
+
+
+# The Data folder next to this module, so the data loads from any working directory.
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data')
+
+# Loaded data by file name without the .json extension.
+loaded_data = {}
+load_lock = threading.Lock()
+
+
+def freeze(data):
+    """Turns parsed json data into read-only containers. Dictionaries become mappings and lists
+    become tuples.
+
+    Args:
+        data (dict, list, str, int, float): Parsed json data.
+
+    Returns:
+        MappingProxyType, tuple, str, int, float: The data in read-only form.
+    """
+    if isinstance(data, dict):
+        return MappingProxyType({key: freeze(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return tuple(freeze(value) for value in data)
+    return data
+
+
+def get_data(name):
+    """Returns the read-only contents of a json file in the Data folder. The file is loaded the
+    first time it is asked for.
+    Example. get_data('government_data') returns the contents of Data/government_data.json
+
+    Args:
+        name (str): File name without the .json extension.
+
+    Raises:
+        TypeError: name needs to be of type string.
+
+    Returns:
+        MappingProxyType, tuple: The parsed json data.
+    """
+    if not isinstance(name, str):
+        raise TypeError(f'name needs to be of type string. Type provided: {type(name)}')
+
+    data = loaded_data.get(name)
+    if data == None:
+        with load_lock:
+            # Another thread might have loaded the file while this one waited.
+            data = loaded_data.get(name)
+            if data == None:
+                with open(os.path.join(DATA_DIRECTORY, f'{name}.json'),) as data_json:
+                    data = freeze(json.load(data_json))
+                loaded_data[name] = data
+
+    return data
+
+
+def preload():
+    """Loads every json file in the Data folder. Call it when a worker starts so generating
+    legends never waits on the disk.
+
+    Returns:
+        tuple: Names of the loaded files.
+    """
+    names = sorted(file_name[:-len('.json')] for file_name in os.listdir(DATA_DIRECTORY)
+                    if file_name.endswith('.json'))
+    for name in names:
+        get_data(name)
+
+    return tuple(names)
@@ -0,0 +1,112 @@
+# Bounded cache of loaded fonts. The FreeTypeFont of each (path, size) pair is kept until the
+# cache is full, so drawing legends in bulk does not load the same font over and over.
+import threading
+from collections import OrderedDict
+from PIL import ImageFont
+
+
+# A legend uses around a hundred (font, size) pairs. A full cache of the legend font takes
+# about 10 MB.
+MAX_FONTS = 128
+
+
+class FontCache:
+    """Least recently used cache of FreeTypeFont objects keyed by font path and size.
+    """
+    def __init__(self, max_fonts: int = MAX_FONTS):
+        """Creates an empty cache.
+
+        Args:
+            max_fonts (int, optional): Most fonts kept before the least recently used one is
+            dropped. Defaults to MAX_FONTS.
+
+        Raises:
+            TypeError: max_fonts needs to be of type int.
+            ValueError: max_fonts needs to be greater than 0.
+        """
+        if not isinstance(max_fonts, int):
+            raise TypeError(f'max_fonts needs to be of type int. Type provided: {type(max_fonts)}')
+        elif max_fonts < 1:
+            raise ValueError(f'max_fonts needs to be greater than 0. Value provided: {max_fonts}')
+
+        self.max_fonts = max_fonts
+        self.hits = 0
+        self.misses = 0
+        self.fonts = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_font(self, font_path: str, size: int) -> ImageFont.FreeTypeFont:
+        """Returns the font at font_path in the given size, loading it if it is not cached.
+
+        Args:
+            font_path (str): Path to a truetype font.
+            size (int): Font size in pixels.
+
+        Raises:
+            TypeError: font_path needs to be of type string.
+            TypeError: size needs to be of type int.
+
+        Returns:
+            ImageFont.FreeTypeFont: The loaded font. Shared with every other user of the cache.
+        """
+        if not isinstance(font_path, str):
+            raise TypeError(f'font_path needs to be of type string. Type provided: {type(font_path)}')
+        if not isinstance(size, int):
+            raise TypeError(f'size needs to be of type int. Type provided: {type(size)}')
+
+        key = (font_path, size)
+        with self.lock:
+            font = self.fonts.get(key)
+            if not font == None:
+                self.fonts.move_to_end(key)
+                self.hits += 1
+                return font
+
+            self.misses += 1
+
+            # Let FreeType read the file from the path.
+            font = ImageFont.truetype(font_path, size)
+            self.fonts[key] = font
+
+            # Drop the least recently used font when the cache is full.
+            if len(self.fonts) > self.max_fonts:
+                self.fonts.popitem(last=False)
+
+        return font
+
+    def cache_info(self) -> dict:
+        """Returns usage statistics for sizing the cache.
+
+        Returns:
+            dict: hits, misses, number of cached fonts and max_fonts.
+        """
+        with self.lock:
+            return {'hits' : self.hits,
+                    'misses' : self.misses,
+                    'fonts' : len(self.fonts),
+                    'max_fonts' : self.max_fonts}
+
+    def clear(self):
+        """Drops every cached font and resets the counters.
+        """
+        with self.lock:
+            self.fonts.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Cache shared by the whole process.
+font_cache = FontCache()
+
+
+def get_font(font_path: str, size: int) -> ImageFont.FreeTypeFont:
+    """Returns a font from the process wide font cache.
+
+    Args:
+        font_path (str): Path to a truetype font.
+        size (int): Font size in pixels.
+
+    Returns:
+        ImageFont.FreeTypeFont: The loaded font.
+    """
+    return font_cache.get_font(font_path, size)
@@ -1,8 +1,9 @@
 # Takes an UPP dictionary (Universal planetary profile) and cretes a map legend
 # This include descriptive name of the different colors, goverment type, temperature range,
 # Atmosphearic demands, Startport quality and trade codes.
-import json
 import os
+from functools import lru_cache
+from types import MappingProxyType
 import colors
 import io
 import math
@@ -13,8 +14,14 @@ from planet_generator import upp_to_dict
 from PIL import Image
 from PIL import ImageDraw
 from PIL import ImageFont
-from random import choice as random_choice
-from random import randint
+from data_registry import get_data
+from font_cache import get_font
+from planet_rng import PlanetRng
+from planet_rng import ensure_rng
+from planetary_tables import atmosphere_table
+from planetary_tables import population_table
+from planetary_tables import size_table
+from planetary_tables import temperature_table
 
 
 # Constants
@@ -23,6 +30,8 @@ FONT_COLOR = tuple(colors.get_rgb_color('black'))
 LINE_COLOR = tuple(colors.get_rgb_color('black'))
 BACKGROUND_COLOR = tuple(colors.get_rgb_color('dim_gray', 0))
 LINE_WIDTH = 12
+MAX_FONT_SIZE = 400
+REFERENCE_FONT_SIZE = 100
 
 
 class BoundBox:
@@ -270,6 +279,79 @@ def percent_of_number(num, percentage) -> float:
     return int(num * (percentage / 100))
 
 
+def compile_trade_requirement(key, requirement):
+    """Turns one trade code requirement from the JSON data into a test that checks many worlds at
+    once.
+
+    Args:
+        key (str): UPP key the requirement tests. Example. 'population'
+        requirement (list): ['range', min, max] or ['specific', [allowed values]].
+
+    Raises:
+        ValueError: If the requirement is neither a range nor a list of specific values.
+
+    Returns:
+        function: Takes worlds indexable by UPP key and returns a boolean array that is True for
+        every world meeting the requirement.
+    """
+    if requirement[0] == 'range':
+        min, max = requirement[1], requirement[2]
+        return lambda worlds: (worlds[key] >= min) & (worlds[key] <= max)
+    elif requirement[0] == 'specific':
+        allowed_values = np.array(requirement[1])
+        return lambda worlds: np.isin(worlds[key], allowed_values)
+
+    raise ValueError(f'Trade code requirements must be of type range or specific. Requirement provided: {requirement}')
+
+
+@lru_cache(maxsize=1)
+def trade_code_rules():
+    """Loads the trade code determinants from JSON and compiles them once.
+
+    Returns:
+        tuple: (code, tests) pairs in the order of the JSON data. A trade code applies to a world
+        if every one of its tests passes.
+    """
+    # Load the trade code determinants from JSON.
+    trade_requirements = get_data('trade_code_classification')
+
+    rules = []
+    for _, type_requirements in trade_requirements.items():
+        # Code is not a test but the tradecode appended if all tests pass
+        tests = tuple(compile_trade_requirement(key, requirement)
+                        for key, requirement in type_requirements.items()
+                        if not key == 'code' and not requirement == None)
+        rules.append((type_requirements.get('code'), tests))
+
+    return tuple(rules)
+
+
+def determine_trade_codes_batch(worlds):
+    """Checks which trade codes apply to many planets at once.
+
+    Args:
+        worlds (np.ndarray, dict): A structured array from planet_generator.parse_upp_batch or a
+        dictionary of equally long arrays, keyed like an UPP dictionary. Leave out the invalid
+        rows reported by parse_upp_batch.
+
+    Returns:
+        tuple: The trade codes and a boolean np.ndarray of shape (number of worlds, number of codes)
+        that is True where a code applies to a world.
+    """
+    if isinstance(worlds, dict):
+        world_count = len(next(iter(worlds.values())))
+    else:
+        world_count = len(worlds)
+
+    rules = trade_code_rules()
+    applies = np.ones((world_count, len(rules)), dtype=bool)
+    for column, (_, tests) in enumerate(rules):
+        for test in tests:
+            applies[:, column] &= test(worlds)
+
+    return tuple(code for code, _ in rules), applies
+
+
 def determine_trade_codes(upp_dict):
     """Takes a universal planetary profile dictionary and checks wich trade codes apply to the
     planet.
@@ -277,54 +359,13 @@ def determine_trade_codes(upp_dict):
     Args:
         upp_dict (Dict): A dictionary containing all the universal planetary profile information
 
-    Raises:
-        ValueError: Raises a ValueError if the number of tests passed is greater than the number
-        of passable tests.
-
     Returns:
         List: Returns a list of tradecodes.
     """
-    # Load the trade code determinants from JSON.
-    with open("Data/trade_code_classification.json",) as trade_requirement_data:
-        trade_requirements = json.load(trade_requirement_data)
+    worlds = {key: np.array([value]) for key, value in upp_dict.items()}
+    codes, applies = determine_trade_codes_batch(worlds)
 
-    categorization = []
-    # Start checking wich codes apply going through each element in the json data.
-    for _, type_requirements in trade_requirements.items():
-        
-        # Set requirement met to False
-        trade_code_requirement_met = False
-
-        # Set test variables
-        number_of_tests = 0
-        number_of_passed_tests = 0
-
-        # Count number of tests to pass
-        for key, requirement in type_requirements.items():
-            # Code is not a test but the tradecode appended if all tests pass
-            if not key == 'code' and not requirement == None:
-                number_of_tests += 1
-
-        # Perform the tests
-        for key, requirement in type_requirements.items():
-            if not key == 'code' and not requirement == None:
-                if requirement[0] == 'range':
-                    min, max = requirement[1], requirement[2]
-                    if value_in_range(upp_dict.get(key), min, max):
-                        number_of_passed_tests += 1
-                elif requirement[0] == 'specific':
-                    if upp_dict.get(key) in requirement[1]:
-                        number_of_passed_tests += 1
-
-        if number_of_passed_tests == number_of_tests:
-            trade_code_requirement_met = True
-        elif number_of_passed_tests > number_of_tests:
-            raise ValueError('Number of passed test can not exceed the total number of tests.')
-        # Append the viable trade codes to a list if all requirements are met.
-        if trade_code_requirement_met:
-            categorization.append(type_requirements.get('code'))
-
-    return categorization
+    return [code for code, code_applies in zip(codes, applies[0]) if code_applies]
 
 
 def generate_legend_document():
@@ -441,41 +482,88 @@ def get_trade_goods(trade_codes):
     if not validate_trade_codes(trade_codes):
         raise TypeError(f'One or more trade codes are not valid.\nCodes: {trade_codes}')
 
+    # Step through the goods that apply to this set of trade codes.
+    trade_goods = {}
+    for type, purchase_dm, sell_dm, available in trade_goods_for_codes(frozenset(trade_codes)):
+        trade_goods.update({type : {'purchase_dm' : purchase_dm, 'sale_dm' : sell_dm,
+                                    'availability' : available}})
+
+    return trade_goods
+
+
+@lru_cache(maxsize=1)
+def trade_goods_index():
+    """Builds an inverted index of the trade goods table, from trade code to the goods it affects.
+
+    Returns:
+        tuple: The trade goods in table order, a boolean np.ndarray that is True for goods
+        available everywhere and a mapping from every trade code to its (availability,
+        purchase dm, sale dm) arrays over the trade goods.
+    """
     # Import the json-data
-    with open("Data/trade_goods_table.json",) as trade_goods_data:
-        trade_requirements = json.load(trade_goods_data)
-    
+    trade_goods_table = get_data('trade_goods_table')
+    goods = tuple(trade_goods_table)
+
+    available_everywhere = np.zeros(len(goods), dtype=bool)
+    index = {}
+    def code_entry(code):
+        if not code in index:
+            index[code] = ( np.zeros(len(goods), dtype=bool),
+                            np.zeros(len(goods), dtype=int),
+                            np.zeros(len(goods), dtype=int))
+        return index[code]
+
+    for position, goods_data in enumerate(trade_goods_table.values()):
+        for code in goods_data.get('availability'):
+            if code == 'all':
+                available_everywhere[position] = True
+            else:
+                code_entry(code)[0][position] = True
+        for code, purchase_dm in goods_data.get('purchase_dm').items():
+            code_entry(code)[1][position] = purchase_dm
+        for code, sell_dm in goods_data.get('sale_dm').items():
+            code_entry(code)[2][position] = sell_dm
+
+    # Make the index read-only.
+    available_everywhere.flags.writeable = False
+    for arrays in index.values():
+        for array in arrays:
+            array.flags.writeable = False
+
+    return goods, available_everywhere, MappingProxyType(index)
+
+
+@lru_cache(maxsize=512)
+def trade_goods_for_codes(trade_codes):
+    """Finds the trade goods of a set of trade codes. Results are kept per set of codes since
+    only a few hundred combinations occur across a sector.
 
-    # Step through the data
-    trade_goods = {}
-    for type, goods_data in trade_requirements.items():
-
-        # Step through trade codes and check if they are available, if they have buy dm, if they have sell dm.
-        available = False
-        purchase_dm = 0
-        sell_dm = 0
-        for code in trade_codes: 
-            # Is the goods available at the planet.
-            if code in goods_data.get('availability') or 'all' in goods_data.get('availability'):
-                available = True
-
-            # If there is a buy dm save the highest applicable.
-            if not goods_data.get('purchase_dm').get(code) == None:
-                if goods_data.get('purchase_dm').get(code) > purchase_dm:
-                    purchase_dm = goods_data.get('purchase_dm').get(code)
-
-            # If there is a sell dm save the highest one applicable.
-            if not goods_data.get('sale_dm').get(code) == None:
-                if goods_data.get('sale_dm').get(code) > sell_dm:
-                    sell_dm = goods_data.get('sale_dm').get(code)
-        
-        # If available and a buy or sell dm exist save the highest one that occured
-        if available or purchase_dm > 0 or sell_dm > 0:
-            trade_goods.update({type : {'purchase_dm' : purchase_dm, 'sale_dm' : sell_dm,
-                                        'availability' : available}})
+    Args:
+        trade_codes (frozenset): Valid trade codes of the planet.
 
+    Returns:
+        tuple: (type, purchase dm, sale dm, availability) of every trade good that is available or
+        has a positive purchase or sale dm, in table order. The dms are the highest applicable.
+    """
+    goods, available_everywhere, index = trade_goods_index()
 
-    return trade_goods
+    # Goods available everywhere still need the planet to have a trade code.
+    available = available_everywhere & (len(trade_codes) > 0)
+    purchase_dm = np.zeros(len(goods), dtype=int)
+    sell_dm = np.zeros(len(goods), dtype=int)
+    for code in trade_codes:
+        code_data = index.get(code)
+        if code_data == None:
+            continue
+        code_available, code_purchase_dm, code_sell_dm = code_data
+        available = available | code_available
+        np.maximum(purchase_dm, code_purchase_dm, out=purchase_dm)
+        np.maximum(sell_dm, code_sell_dm, out=sell_dm)
+
+    # If available and a buy or sell dm exist save the highest one that occured
+    listed = available | (purchase_dm > 0) | (sell_dm > 0)
+    return tuple((goods[position], int(purchase_dm[position]), int(sell_dm[position]),
+                    bool(available[position])) for position in np.flatnonzero(listed))
 
 
 def validate_box_dimensions(box_dimensions):
@@ -702,6 +790,60 @@ def get_font_align_offsets(box_dimensions, text, font, horizontal = 'left',
     return adjustment_x, adjustment_y
 
 
+def search_font_size(measure, width, height, padding = 0):
+    """Finds the largest font size from 1 to MAX_FONT_SIZE where a text fits inside a box, assuming
+    the text grows with the font size. A measurement at REFERENCE_FONT_SIZE is scaled to the box for
+    a first guess. The search then steps away from the guess with doubling steps until the text
+    stops or starts to fit and bisects the last step, measuring the text a handful of times.
+
+    Args:
+        measure (function): Takes a font size and returns the (width, height) of the text.
+        width (int): Width of the box.
+        height (int): Height of the box.
+        padding (int, optional): Padding in the box. Defaults to 0.
+
+    Returns:
+        int: The largest font size that fits. 1 if no size fits.
+    """
+    available_width = width - 2 * padding
+    available_height = height - 2 * padding
+
+    def fits(size):
+        text_width, text_height = measure(size)
+        return text_width <= available_width and text_height <= available_height
+
+    # Scale the text at the reference size to fill the box.
+    text_width, text_height = measure(REFERENCE_FONT_SIZE)
+    scale = min(available_width / text_width if text_width > 0 else math.inf,
+                available_height / text_height if text_height > 0 else math.inf)
+    guess = int(min(max(REFERENCE_FONT_SIZE * scale, 1), MAX_FONT_SIZE))
+
+    # The text fits at size low and does not fit at size high.
+    low, high = 0, MAX_FONT_SIZE + 1
+    step = 1
+    if fits(guess):
+        low = guess
+        while low + step < high and fits(low + step):
+            low += step
+            step *= 2
+        high = min(high, low + step)
+    else:
+        high = guess
+        while high - step > low and not fits(high - step):
+            high -= step
+            step *= 2
+        low = max(low, high - step)
+
+    while high - low > 1:
+        middle = (low + high) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+
+    return max(low, 1)
+
+
 def get_max_font_size(box_dimensions, text, font_path, padding = 0):
     """Takes a bounding box and returns the largest possible font size. If you wish to 
     write out text in the font from the provided font_path. Optionally space for padding
@@ -744,22 +886,13 @@ def get_max_font_size(box_dimensions, text, font_path, padding = 0):
     elif not padding >= 0:
         raise ValueError(f'padding must be a positive integer. Provided value: {padding}')
 
-    # Try every font size from 1-400 until text_width or text_height is larger than the bounding box.
-    font_size = 1
-    width, height = get_box_dimension_size(box_dimensions)
-    for size in range(1, 401):
-        font = ImageFont.truetype(font_path, size)
-        x1, y1, x2, y2 = font.getbbox(text)
-        text_width = x2 - x1
-        text_height = y2 - y1
-
-        # Break if we have reached the largest font size possible.
-        if text_width > width - 2 * padding or text_height > height - 2 * padding:
-            break
-
-        font_size = size
+    # Search the font sizes 1-400 for the largest where the text fits inside the bounding box.
+    def measure(size):
+        x1, y1, x2, y2 = get_font(font_path, size).getbbox(text)
+        return x2 - x1, y2 - y1
 
-    return font_size
+    width, height = get_box_dimension_size(box_dimensions)
+    return search_font_size(measure, width, height, padding)
 
 
 def get_multiline_max_font_size(box_dimensions, text, font_path, padding = 0, spacing = 4.0):
@@ -832,26 +965,18 @@ def get_multiline_max_font_size(box_dimensions, text, font_path, padding = 0, sp
         return get_max_font_size(sub_box.get_dimensions(), text, font_path, padding)
 
     
-    # Try every font size from 1-400 until text_width or text_height is larger than the bounding box.
-    font_size = 1
+    # Search the font sizes 1-400 for the largest where the text fits inside the bounding box.
     xy = (0, 0)
     width, height = sub_box.get_width_height()
     image = Image.new('RGBA', (width, height))
     imDraw = ImageDraw.ImageDraw(image)
 
-    for size in range(1, 401):
-        font = ImageFont.truetype(font_path, size)
+    def measure(size):
+        font = get_font(font_path, size)
         x1, y1, x2, y2 = imDraw.multiline_textbbox(xy, text, font=font, spacing=spacing)
-        text_width = x2 - x1
-        text_height = y2 - y1
-
-        # Break if we have reached the largest font size possible.
-        if text_width > width - 2 * padding or text_height > height - 2 * padding:
-            break
-
-        font_size = size
+        return x2 - x1, y2 - y1
 
-    return font_size
+    return search_font_size(measure, width, height, padding)
 
 
 def draw_text_bound_box(bound_box : BoundBox, text : str, font_path : str, draw : ImageDraw.ImageDraw,
@@ -970,7 +1095,7 @@ def draw_text_bound_box(bound_box : BoundBox, text : str, font_path : str, draw
         font_size = get_multiline_max_font_size(bound_box, text, font_path, padding, spacing)
 
     # Create font.
-    font = ImageFont.truetype(font_path, font_size)
+    font = get_font(font_path, font_size)
 
     # Get anchor position.
     x1 = bound_box.get_side('left')
@@ -1056,26 +1181,34 @@ def draw_text_in_list(legend_draw, font, font_color, box_dimensions, list, paddi
         y_offset += (box_dimensions[1][1] - box_dimensions [0][1])
 
 
-def roll_2d():
+def roll_2d(rng=None):
     """Rolls two six sided dies and returns the sum rolled.
 
+    Args:
+        rng (PlanetRng, optional): Generator to roll the dice with. Defaults to None.
+
     Returns:
         int: Sum of the two dice rolled.
     """
-    dice1 = randint(1,6)
-    dice2 = randint(1,6)
+    rng = ensure_rng(rng)
+    dice1 = rng.randint(1,6)
+    dice2 = rng.randint(1,6)
 
     return dice1 + dice2
 
 
-def roll_d66():
+def roll_d66(rng=None):
     """Rolls two six sided dies with one representing the ones and one representing the tens
 
+    Args:
+        rng (PlanetRng, optional): Generator to roll the dice with. Defaults to None.
+
     Returns:
         int: 11-16, 21-26, 31-36, 41-46, 51-56, 61-66
     """
-    dice1 = int(randint(1,6) * 10)
-    dice2 = randint(1,6)
+    rng = ensure_rng(rng)
+    dice1 = int(rng.randint(1,6) * 10)
+    dice2 = rng.randint(1,6)
 
     return dice1 + dice2
 
@@ -1150,7 +1283,7 @@ def legend_append_trade_codes(legend_image, trade_codes):
     
     # Determine maxiumum font size with padding.
     font_size = get_max_font_size(b1, text, FONT_PATH, padding)
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
 
     x_alignment, y_alignment = get_font_align_offsets(  b1, text, font,
                                                         vertical='center',
@@ -1164,7 +1297,7 @@ def legend_append_trade_codes(legend_image, trade_codes):
     # Get maximum font size for b2 and create font.
     text = 'Trade goods'
     font_size = get_max_font_size(b2, text, FONT_PATH, padding)
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
 
     x_alignment, y_alignment = get_font_align_offsets(  b2, text, font,
                                                         vertical='center',
@@ -1175,7 +1308,7 @@ def legend_append_trade_codes(legend_image, trade_codes):
 
     text = 'Purchase | Sell DM'
     font_size = get_max_font_size(b3, text, FONT_PATH, padding)
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
 
     x_alignment, y_alignment = get_font_align_offsets(  b3, text, font,
                                                         horizontal='center',
@@ -1213,7 +1346,7 @@ def legend_append_trade_codes(legend_image, trade_codes):
                             font_size: {font_size}, padding: {padding}''')
 
     # Create the font with the largest font_size that will fit.
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
 
     # Assign special padding to the sub boxes of b5.
     b5_width, _ = get_box_dimension_size(b5)
@@ -1255,17 +1388,21 @@ def legend_append_trade_codes(legend_image, trade_codes):
     return legend_image
 
 
-def legend_append_planetary_metrics(legend_image, upp_dict):
+def legend_append_planetary_metrics(legend_image, upp_dict, rng=None):
     """Adds planetary metrics to the top middle of the legend document.
     Metrics like: Gravity, temperature etc.
 
     Args:
         legend_image (Image.Image): Image containing the legend document information.
         upp_dict (dict): dictionary with all UPP-data.
+        rng (PlanetRng, optional): Generator for diameter, day length and temperatures.
+        Defaults to None.
 
     Returns:
         Image.Image: PIL.Image with planetary metrics.
     """
+    rng = ensure_rng(rng)
+
     # Calculates planetary metrics using the upp_dict.
     #|-------------------------------------|
     #|b1                                   |
@@ -1315,80 +1452,14 @@ def legend_append_planetary_metrics(legend_image, upp_dict):
     x1 ,y1 = b1.start
     sub_box_b1 = BoundBox(x1, y1, x1 + b1.get_width(), y1 + int(b1.get_height()/3))
 
-    # Get diamater and gravity data.
-    diamater = None
-    gravity = None
-    size = upp_dict.get('size')
-
-    # TODO: This data could be added as JSON database with int keys. Reducing the amount of lines
-    # used.
-    if size == 0:
-        diamater = randint(500, 100)
-        gravity = 'Negligible'
-    elif size == 1:
-        diamater = randint(1100,2200)
-        gravity = '0.05 G'
-    elif size == 2:
-        diamater = randint(2800,3600)
-        gravity = '0.15 G'
-    elif size == 3:
-        diamater = randint(4400,5200)
-        gravity = '0.25 G'
-    elif size == 4:
-        diamater = randint(6000,6800)
-        gravity = '0.35 G'
-    elif size == 5:
-        diamater = randint(7600,8400)
-        gravity = '0.45 G'
-    elif size == 6:
-        diamater = randint(9200,10000)
-        gravity = '0.7 G'
-    elif size == 7:
-        diamater = randint(10800,11600)
-        gravity = '0.9 G'
-    elif size == 8:
-        diamater = randint(12400,13200)
-        gravity = '1.0 G'
-    elif size == 9:
-        diamater = randint(14000,14800)
-        gravity = '1.25 G'
-    elif size == 10:
-        diamater = randint(15600,16400)
-        gravity = '1.4 G'
-    
-    # TODO: This data could be added as JSON database with int keys. Reducing the amount of lines
-    # used.
-    # Get population data.
-    population = None
-    upp_population = upp_dict.get('population')
-
-    if upp_population == 0:
-        population = 'None'
-    elif upp_population == 1:
-        population = 'Few'
-    elif upp_population == 2:
-        population = 'Hundreds'
-    elif upp_population == 3:
-        population = 'Thousands'
-    elif upp_population == 4:
-        population = 'Tens of thousands'
-    elif upp_population == 5:
-        population = 'Hundreds of thousands'
-    elif upp_population == 6:
-        population = 'Millions'
-    elif upp_population == 7:
-        population = 'Tens of millions'
-    elif upp_population == 8:
-        population = 'Hundreds of millions'
-    elif upp_population == 9:
-        population = 'Billions'
-    elif upp_population == 10:
-        population = 'Tens of billions'
-    elif upp_population == 11:
-        population = 'Hundred of billions'
-    elif upp_population == 12:
-        population = 'Trillions, World-Ciy'
+    # Get diamater, gravity and population data.
+    size_data = size_table.get(upp_dict.get('size'))
+    diamater, gravity = None, None
+    if size_data != None:
+        diamater = rng.randint(*size_data['diameter'])
+        gravity = size_data['gravity']
 
+    population = population_table.get(upp_dict.get('population'))
 
     # Create datastrings in a list.
     size_and_population_metrics =[
@@ -1403,88 +1474,27 @@ def legend_append_planetary_metrics(legend_image, upp_dict):
                                                 padding)
 
     # Create font
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
     
     # Draw size and population data.
     draw_text_in_list( legend_draw, font, FONT_COLOR, sub_box_b1.get_dimensions(),
                         size_and_population_metrics, padding)
 
-    # TODO: This data could be added as JSON database with int keys. Reducing the amount of lines
-    # used.
     # Get atmospheric data
-    atmosphere = None
-    ppe_required = None
-    atmosphere_type = upp_dict.get('atmosphere_type')
-    if atmosphere_type == 0:
-        atmosphere = 'None'
-        ppe_required = 'Vacc Suit'
-    elif atmosphere_type == 1:
-        atmosphere = 'Trace'
-        ppe_required = 'Vacc Suit'
-    elif atmosphere_type == 2:
-        atmosphere = 'Very Thin, Tainted'
-        ppe_required = 'Respirator, Filter'
-    elif atmosphere_type == 3:
-        atmosphere = 'Very Thin'
-        ppe_required = 'Respirator'
-    elif atmosphere_type == 4:
-        atmosphere = 'Thin, Tainted'
-        ppe_required = 'Filter'
-    elif atmosphere_type == 5:
-        atmosphere = 'Thin'
-        ppe_required = 'None'
-    elif atmosphere_type == 6:
-        atmosphere = 'Standard, Tainted'
-        ppe_required = 'None'
-    elif atmosphere_type == 7:
-        atmosphere = 'Standard, Tainted'
-        ppe_required = 'Filter'
-    elif atmosphere_type == 8:
-        atmosphere = 'Dense'
-        ppe_required = 'None'
-    elif atmosphere_type == 9:
-        atmosphere = 'Dense, Tainted'
-        ppe_required = 'Filter'
-    elif atmosphere_type == 10:
-        atmosphere = 'Exotic'
-        ppe_required = 'Air Supply'
-    elif atmosphere_type == 11:
-        atmosphere = 'Corrosive'
-        ppe_required = 'Vacc Suit'
-    elif atmosphere_type == 12:
-        atmosphere = 'Insidious'
-        ppe_required = 'Vacc Suit'
-    elif atmosphere_type == 13:
-        atmosphere = 'Very Dense'
-        ppe_required = 'None'
-    elif atmosphere_type == 14:
-        atmosphere = 'Low'
-        ppe_required = 'None'
-    elif atmosphere_type == 15:
-        atmosphere = 'Unusual'
-        ppe_required = 'Varies'
-    
+    atmosphere, ppe_required = None, None
+    atmosphere_data = atmosphere_table.get(upp_dict.get('atmosphere_type'))
+    if atmosphere_data != None:
+        atmosphere = atmosphere_data['description']
+        ppe_required = atmosphere_data['ppe_required']
 
     # Generate the min/max temperature and determine day/night cycle.
-    day_length = 8 + 8 * upp_dict.get('size') + randint(-4, 4)
+    day_length = 8 + 8 * upp_dict.get('size') + rng.randint(-4, 4)
 
     min_temperature, max_temperature = None, None
-    temp_info = upp_dict.get('temperature')
-    if temp_info == 'frozen':
-        min_temperature = randint(-273, -70)
-        max_temperature = randint(-60, -51)
-    elif temp_info == 'cold':
-        min_temperature = randint(-51, -25)
-        max_temperature = randint(-20, 0)
-    elif temp_info == 'temperate':
-        min_temperature = randint(-5, 1)
-        max_temperature = randint(20, 30)
-    elif temp_info == 'hot':
-        min_temperature = randint(27, 40)
-        max_temperature = randint(63, 80)
-    elif temp_info == 'boiling':
-        min_temperature = randint(81, 90)
-        max_temperature = randint(176, 800)
+    temperature_data = temperature_table.get(upp_dict.get('temperature'))
+    if temperature_data != None:
+        min_temperature = rng.randint(*temperature_data['min'])
+        max_temperature = rng.randint(*temperature_data['max'])
 
     # Make the string data
     planetary_metrics =[
@@ -1512,7 +1522,7 @@ def legend_append_planetary_metrics(legend_image, upp_dict):
                                                 padding=8)
 
     # Create the font
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
 
     # Render the data
     draw_text_in_list( legend_draw,
@@ -1601,8 +1611,8 @@ def legend_append_planetary_image(legend_image : Image.Image , path : str) -> Im
 
     bbox = BoundBox(x_offset, y_offset, x_offset + box_side, y_offset + box_side)
 
-    # Load planetary image
-    planet_image = Image.open(path)
+    # Load planetary image. Palette images are converted so they can be composited.
+    planet_image = Image.open(path).convert('RGBA')
 
     # Append in boundbox
     planet_image = planet_image.resize(bbox.get_width_height())
@@ -1658,7 +1668,7 @@ def legend_append_color_legend(legend_image, color_palette):
     font_size = get_max_font_size_from_list(text, FONT_PATH, sub_box.get_dimensions(), padding)
 
     # Create the font
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
 
     # Print every element and add a colored box to the end of it.
     x, y = main_box.start
@@ -1751,14 +1761,13 @@ def legend_append_name_government_data(legend_image, planet_name, upp_dict):
     
     # Create font
     font_size = get_max_font_size_from_list(b1_data, FONT_PATH, sub_box_b1.get_dimensions(), padding)
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
 
     draw_text_in_list(legend_draw, font, FONT_COLOR, sub_box_b1.get_dimensions(), b1_data, padding)
 
     # Get goverment type.
     # Import the json-data
-    with open("Data/government_data.json",) as government_data:
-        government_information = json.load(government_data)
+    government_information = get_data('government_data')
 
     government_number = str(upp_dict.get('government_type'))
     government_dict = government_information.get(government_number)
@@ -1773,7 +1782,7 @@ def legend_append_name_government_data(legend_image, planet_name, upp_dict):
     sub_box_b2 = BoundBox(x1, y1, x2, y2)
 
     font_size = get_max_font_size_from_list(text, FONT_PATH, sub_box_b2.get_dimensions(), padding)
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
 
     draw_text_in_list(legend_draw, font, FONT_COLOR, sub_box_b2.get_dimensions(), text, padding)
 
@@ -1803,7 +1812,7 @@ def legend_append_name_government_data(legend_image, planet_name, upp_dict):
 
         # Create font
         font_size = int(im_height / 4)
-        font = ImageFont.truetype(FONT_PATH, font_size)
+        font = get_font(FONT_PATH, font_size)
 
         # Get law level to write
         law_level = str(upp_dict.get('law_level'))
@@ -1833,7 +1842,7 @@ def legend_append_name_government_data(legend_image, planet_name, upp_dict):
 
         # Create font
         font_size = int(im_height / 4)
-        font = ImageFont.truetype(FONT_PATH, font_size)
+        font = get_font(FONT_PATH, font_size)
 
         # Get tech level to write
         law_level = str(upp_dict.get('tech_level'))
@@ -1856,32 +1865,30 @@ def legend_append_name_government_data(legend_image, planet_name, upp_dict):
     return legend_image
 
 
-def generate_faction_name():
+def generate_faction_name(rng=None):
     """Generates a faction name randomly using lists of adjective,
     adverbs, nouns and verbs
 
+    Args:
+        rng (PlanetRng, optional): Generator to pick the words with. Defaults to None.
+
     Returns:
         string: A text string representing a faction name
     """
-    # Import the json-data
-    with open("Data/nouns.json",) as nouns_json:
-        nouns_list = json.load(nouns_json)
+    rng = ensure_rng(rng)
 
-    with open("Data/verbs.json",) as verbs_json:
-        verbs_list = json.load(verbs_json)
-
-    with open("Data/adverbs.json",) as adverbs_json:
-        adverbs_list = json.load(adverbs_json)
-    
-    with open("Data/adjectives.json",) as adjectives_json:
-        adjectives_list = json.load(adjectives_json)
+    # Import the json-data
+    nouns_list = get_data('nouns')
+    verbs_list = get_data('verbs')
+    adverbs_list = get_data('adverbs')
+    adjectives_list = get_data('adjectives')
 
     # Generate random adjective, adverbs, nouns and verbs
-    adjective = random_choice(adjectives_list)
-    adverb = random_choice(adverbs_list)
-    noun = random_choice(nouns_list)
-    noun2 = random_choice(nouns_list)
-    verb = random_choice(verbs_list)
+    adjective = rng.choice(adjectives_list)
+    adverb = rng.choice(adverbs_list)
+    noun = rng.choice(nouns_list)
+    noun2 = rng.choice(nouns_list)
+    verb = rng.choice(verbs_list)
 
 
     generated_name_list =[
@@ -1892,46 +1899,48 @@ def generate_faction_name():
         f'{verb} {noun} of {adjective} {noun2}s'
     ]
 
-    return random_choice(generated_name_list)
+    return rng.choice(generated_name_list)
 
 
-def generate_factions(upp_dict : dict) -> dict:
+def generate_factions(upp_dict : dict, rng = None) -> dict:
     """Takes UPP data and returns randomly generated factions.
 
     Args:
         upp_dict (dict): UPP data in dictionary form.
+        rng (PlanetRng, optional): Generator for every faction roll. Defaults to None.
 
     Returns:
         dict: Includes a dictionary for each faction. Faction name being the keys for the
         subdictionaries.
     """
+    rng = ensure_rng(rng)
+
     # Create an empty dict to hold the values
     faction_dict = {}
 
     # Determine how many factions should be generated
     # Formula roll a D3 add +1 if government type is 0 or 7
-    number_of_factions = randint(1, 3)
+    number_of_factions = rng.randint(1, 3)
     government_type = upp_dict.get('government_type')
 
     if government_type == 0 or government_type == 7:
         number_of_factions += 1
 
     # Load in the cultural differences.
-    with open("Data/cultural_differences_data.json",) as cultures_json:
-        culture_dict = json.load(cultures_json)
+    culture_dict = get_data('cultural_differences_data')
 
     # Iterate and create each faction.
     for _ in range(number_of_factions):
         faction = {}
         # Get faction name
-        faction_name = generate_faction_name()
+        faction_name = generate_faction_name(rng)
 
         # Update to faction
         faction.update({'name' : faction_name})
         
         # Get Faction support level
         support_level = ""
-        result = roll_2d()
+        result = roll_2d(rng)
 
         if 0 < result <= 3:
             support_level = 'Obscure group'
@@ -1951,7 +1960,7 @@ def generate_factions(upp_dict : dict) -> dict:
 
         # Get cultural differences/traits
         # Roll D66 for result
-        dice_roll = roll_d66()
+        dice_roll = roll_d66(rng)
 
         # Create empty string variable.
         culture_type = ""
@@ -1960,7 +1969,7 @@ def generate_factions(upp_dict : dict) -> dict:
         if dice_roll == 25:
             # Reroll until the result is not uniqe case 25 or 26
             while dice_roll in [25, 26]:
-                dice_roll = roll_d66()
+                dice_roll = roll_d66(rng)
             culture = culture_dict.get(str(dice_roll)).get('type')
 
             culture_type = f'Influenced - {culture}'
@@ -1968,16 +1977,16 @@ def generate_factions(upp_dict : dict) -> dict:
         # If 26 Generate with a fstring f'Fusion of {reroll1} & {reroll2}
         elif dice_roll == 26:
             # Roll both dice
-            dice_1 = roll_d66()
-            dice_2 = roll_d66()
+            dice_1 = roll_d66(rng)
+            dice_2 = roll_d66(rng)
 
             # Reroll dice1 until the result is not uniqe case 25 or 26
             while dice_1 in [25, 26]:
-                dice_1 = roll_d66()
+                dice_1 = roll_d66(rng)
 
             # Reroll dice2 until its not uniqe case 25, 26 or the same as dice1
             while dice_2 in [25, 26, dice_1]:
-                dice_2 = roll_d66()
+                dice_2 = roll_d66(rng)
 
             # Save the two dictionaries from culture_dict
             culture_1 = culture_dict.get(str(dice_1)).get('type')
@@ -1997,12 +2006,13 @@ def generate_factions(upp_dict : dict) -> dict:
     return faction_dict
 
 
-def legend_append_factions(legend_image, upp_dict):
+def legend_append_factions(legend_image, upp_dict, rng=None):
     """Appends faction information to an image using data from a upp_dict.
 
     Args:
         legend_image (PIL.Image): Image to append the data to.
         upp_dict (dict): dictionary containing UPP-Serial data.
+        rng (PlanetRng, optional): Generator for the faction rolls. Defaults to None.
 
     Returns:
         PIL.Image: Image with the appended faction text.
@@ -2060,7 +2070,7 @@ def legend_append_factions(legend_image, upp_dict):
 
 
     # Get a dictionary of factions
-    factions_dictionary = generate_factions(upp_dict)
+    factions_dictionary = generate_factions(upp_dict, rng)
     
     # Create the lists to be written in subboxes
     faction_names = [f'Faction:']
@@ -2103,7 +2113,7 @@ def legend_append_factions(legend_image, upp_dict):
                                             padding)
 
     # Make a separate font for faction names.
-    name_font = ImageFont.truetype(FONT_PATH, font_size)
+    name_font = get_font(FONT_PATH, font_size)
 
     # Compare to the maximum font size of support levels.
     font_size_temp = get_max_font_size_from_list(faction_support_levels,
@@ -2126,7 +2136,7 @@ def legend_append_factions(legend_image, upp_dict):
         font_size = font_size_temp
 
     # Create the font.
-    font = ImageFont.truetype(FONT_PATH, font_size)
+    font = get_font(FONT_PATH, font_size)
 
     # Write names as list.
     draw_text_in_list( legend_draw,
@@ -2217,14 +2227,12 @@ def legend_append_contraband_lists(legend_image, upp_dict):
 
 
     # Fetch contraband dictionary with contraband for each law level.
-    with open("Data/contraband_data.json",) as contraband_json:
-        contraband_dictionaries = json.load(contraband_json)
+    contraband_dictionaries = get_data('contraband_data')
 
     
     # Determine what the planet considers contraband.
     government_type = str(upp_dict.get('government_type'))
-    with open("Data/government_data.json",) as government_data_json:
-        contraband = json.load(government_data_json).get(government_type).get('contraband')
+    contraband = list(get_data('government_data').get(government_type).get('contraband'))
 
 
     # If Weapon is considered contraband. Also add Armour
@@ -2422,7 +2430,7 @@ def legend_append_contraband_lists(legend_image, upp_dict):
     return legend_image
 
 
-def generate_legend(upp_dict, color_palette, path, planet_name, debug = False):
+def generate_legend(upp_dict, color_palette, path, planet_name, debug = False, rng = None):
     """Generates a planetary legend to give better overview for players.
 
     Args:
@@ -2432,7 +2440,12 @@ def generate_legend(upp_dict, color_palette, path, planet_name, debug = False):
         path (str): string providing the folder where the planetary image has been saved.
         planet_name (str): name of the planet. Used to ensure the legends
         name will be <planet name>_legend
+        debug (bool, optional): Shows the legend instead of saving it. Defaults to False.
+        rng (PlanetRng, optional): Generator for the random legend data. Pass the generator
+        used for the planet to make the legend reproducible from the planet seed. Defaults to None.
     """
+    rng = ensure_rng(rng)
+
     # Make sure the path directory exist. Otherwise create it.
     if not os.path.exists(path):
         os.makedirs(path)
@@ -2448,7 +2461,7 @@ def generate_legend(upp_dict, color_palette, path, planet_name, debug = False):
 
     # Append gravity and diamater data to the top middle of the legend document
     # Atmospherics, Temperature, day/night cycle.
-    legend_doc = legend_append_planetary_metrics(legend_doc, upp_dict)
+    legend_doc = legend_append_planetary_metrics(legend_doc, upp_dict, rng)
 
     # Append planetary image to the top right of the legend document
     planet_image_path = os.path.join(path, planet_name + '.png')
@@ -2461,7 +2474,7 @@ def generate_legend(upp_dict, color_palette, path, planet_name, debug = False):
     legend_doc = legend_append_name_government_data(legend_doc, planet_name, upp_dict)
 
     # Generate factions and add cultures.
-    legend_doc = legend_append_factions(legend_doc, upp_dict)
+    legend_doc = legend_append_factions(legend_doc, upp_dict, rng)
 
     # Determine contraband and append them to the bottom left under separate categories.
     legend_doc = legend_append_contraband_lists(legend_doc, upp_dict)
@@ -2482,8 +2495,9 @@ def main():
     # If called directly. Make planetary data up
     # and display the image.
     debug = True
-    upp_dict = upp_to_dict('A344556-10')
-    color_palette = create_color_palette(upp_dict)
+    rng = PlanetRng()
+    upp_dict = upp_to_dict('A344556-10', rng)
+    color_palette = create_color_palette(upp_dict, rng)
     path = os.path.join(os.getcwd(), 'Saved')
     planet_name = 'Debug'
 
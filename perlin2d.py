@@ -1,18 +1,15 @@
 # Creates the tools returning 2D-perlin noise
 import math
-import random
 import numpy as np
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from multiprocessing import shared_memory
+from planet_rng import PlanetRng
+from planet_rng import ensure_rng
 from PIL import Image
 
 
-# Helper class
-class Vector2d:
-    """ A 2d vector objects holding an X and Y value.
-    """
-    def __init__(self, Coordinates):
-        self.x = Coordinates[0]
-        self.y = Coordinates[1]
-
 # Helper functions
 
 # Returns the dotprocut of two vectors.
@@ -80,10 +77,9 @@ def mylerp(d1:float, d2:float, d3:float, d4:float, fracx: float, fracy: float) -
 sqrt_2 = math.sqrt(2)
 perm_table = [(-1/sqrt_2,-1/sqrt_2), (-1,0), (-1/sqrt_2,1/sqrt_2), (0,-1), (0,1), (1/sqrt_2,-1/sqrt_2),(1,0),(1/sqrt_2,1/sqrt_2)]
 
-#fill a vector table
-vect_table = []
-for perm in perm_table:
-    vect_table.append(Vector2d(perm))
+# The permutation table as an (8, 2) array so whole grids of vectors can be gathered at once.
+# Gradient grids only store int8 indices into this table.
+gradient_table = np.array(perm_table)
 
 
 def rescale_range(range_min, range_max, desired_min, desired_max, value):
@@ -103,7 +99,516 @@ def rescale_range(range_min, range_max, desired_min, desired_max, value):
     """
     return ((value-range_min)/(range_max-range_min))*(desired_max-desired_min)+desired_min
 
-def perlin2d(width:int, height:int, detail:int = 1, octaves:int =1):
+
+def normalize_noise(noisearray, range_min:float, range_max:float):
+    """Rescales a noise array from range_min-range_max to 0-1 in place. This is
+    rescale_range for a whole array without allocating a new one.
+
+    Args:
+        noisearray (np.ndarray): Array to rescale. It is changed in place.
+        range_min (float): Value that becomes 0.
+        range_max (float): Value that becomes 1.
+
+    Returns:
+        np.ndarray: The same array, rescaled.
+    """
+    # A flat array has no range to stretch.
+    if range_max == range_min:
+        noisearray.fill(0.0)
+        return noisearray
+
+    noisearray -= range_min
+    noisearray *= 1/(range_max-range_min)
+
+    return noisearray
+
+
+class NoiseRange:
+    """Keeps track of the lowest and highest noise value over several arrays. Tiles or
+    chunks can be added one by one as they are generated and then be normalized to the
+    same global range in a second pass.
+    """
+    def __init__(self, minimum:float = math.inf, maximum:float = -math.inf):
+        """Creates the range. Without arguments the range is empty until updated.
+
+        Args:
+            minimum (float, optional): Known lowest value. Defaults to math.inf.
+            maximum (float, optional): Known highest value. Defaults to -math.inf.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def update(self, noisearray):
+        """Widens the range to include every value in noisearray.
+
+        Args:
+            noisearray (np.ndarray): A generated noise array.
+        """
+        self.minimum = min(self.minimum, float(np.min(noisearray)))
+        self.maximum = max(self.maximum, float(np.max(noisearray)))
+
+    def normalize(self, noisearray):
+        """Rescales noisearray in place so the tracked range becomes 0-1.
+
+        Args:
+            noisearray (np.ndarray): Array to rescale.
+
+        Raises:
+            ValueError: If the range has not been updated with any values.
+
+        Returns:
+            np.ndarray: The same array, rescaled.
+        """
+        if self.minimum > self.maximum:
+            raise ValueError('The noise range is empty. Update it before normalizing.')
+
+        return normalize_noise(noisearray, self.minimum, self.maximum)
+
+
+def analytic_noise_range(octaves:int, noise_backend:str = 'perlin') -> NoiseRange:
+    """Returns the range noise values between 0-1 can reach without stretching. A single
+    perlin octave is never larger than sqrt(2)/2, simplex and value octaves stay within 1 and
+    every octave has half the effect of the one before. Tiles can be normalized with this
+    range without a first pass.
+
+    Args:
+        octaves (int): Number of octaves in the noise.
+        noise_backend (str, optional): Name of the noise backend. Defaults to 'perlin'.
+
+    Returns:
+        NoiseRange: The widest possible range.
+    """
+    get_noise_backend(noise_backend)
+    amplitude = backend_amplitude[noise_backend] * (1 - 1/2**octaves)
+    return NoiseRange((1 - amplitude)/2, (1 + amplitude)/2)
+
+
+def perlin_octave(lattice_lookup, x_positions, y_positions, dtype):
+    """Calculates one octave of perlin noise for a whole grid of positions at once.
+    The positions are given in gradient grid units and only need to broadcast against each
+    other. E.g. a (width, 1) and a (1, height) array gives a (width, height) result.
+
+    Args:
+        lattice_lookup (function): Takes arrays of grid x and y indices and returns the
+        gradient_table indices of those grid points.
+        x_positions (np.ndarray): X positions scaled to the gradient grid.
+        y_positions (np.ndarray): Y positions scaled to the gradient grid.
+        dtype (np.dtype): Floating point type the noise is calculated in.
+
+    Returns:
+        np.ndarray: Noise values between -1 and 1 in the broadcast shape of the positions.
+    """
+    # Gathering the x and y parts from separate tables is faster than gathering whole vectors.
+    x_table, y_table = gradient_table.T.astype(dtype)
+
+    # Get the grid cell and the fractional position inside it.
+    x1 = np.floor(x_positions).astype(np.intp)
+    y1 = np.floor(y_positions).astype(np.intp)
+
+    # Get the four surrounding vectors.
+    i1 = lattice_lookup(x1, y1)
+    i2 = lattice_lookup(x1, y1+1)
+    i3 = lattice_lookup(x1+1, y1)
+    i4 = lattice_lookup(x1+1, y1+1)
+
+    fracx = (x_positions % 1).astype(dtype, copy=False)
+    fracy = (y_positions % 1).astype(dtype, copy=False)
+
+    # Get the dot product between each corners gradient vector and the distance vector to it.
+    dot1 = x_table[i1]*fracx + y_table[i1]*fracy
+    dot2 = x_table[i2]*fracx + y_table[i2]*(fracy-1)
+    dot3 = x_table[i3]*(fracx-1) + y_table[i3]*fracy
+    dot4 = x_table[i4]*(fracx-1) + y_table[i4]*(fracy-1)
+
+    # Interpolate the points but fade the fractional distances.
+    return mylerp(dot1, dot2, dot3, dot4, fade(fracx), fade(fracy))
+
+
+# Factors moving positions between the square grid and the grid of triangles simplex noise
+# is calculated on.
+SIMPLEX_SKEW = (math.sqrt(3) - 1) / 2
+SIMPLEX_UNSKEW = (3 - math.sqrt(3)) / 6
+
+
+def simplex_octave(lattice_lookup, x_positions, y_positions, dtype):
+    """Calculates one octave of simplex noise for a whole grid of positions at once. Every
+    position lies in a triangle of the skewed grid, so only three corners are evaluated
+    instead of the four of perlin noise, and there are no axis aligned artifacts.
+
+    Args:
+        lattice_lookup (function): Takes arrays of skewed grid x and y indices and returns the
+        gradient_table indices of those grid points.
+        x_positions (np.ndarray): X positions scaled to the gradient grid.
+        y_positions (np.ndarray): Y positions scaled to the gradient grid.
+        dtype (np.dtype): Floating point type the noise is calculated in.
+
+    Returns:
+        np.ndarray: Noise values between -1 and 1 in the broadcast shape of the positions.
+    """
+    x_table, y_table = gradient_table.T.astype(dtype)
+
+    # Get the skewed grid cell.
+    skew = (x_positions + y_positions) * SIMPLEX_SKEW
+    x1 = np.floor(x_positions + skew).astype(np.intp)
+    y1 = np.floor(y_positions + skew).astype(np.intp)
+
+    # Get the distance to the first corner in unskewed space.
+    unskew = (x1 + y1) * SIMPLEX_UNSKEW
+    x_distance = (x_positions - x1 + unskew).astype(dtype, copy=False)
+    y_distance = (y_positions - y1 + unskew).astype(dtype, copy=False)
+
+    # The middle corner depends on which triangle of the cell the position is in.
+    upper_triangle = x_distance > y_distance
+    x_middle = upper_triangle.astype(np.intp)
+    y_middle = 1 - x_middle
+    x_offset = upper_triangle.astype(dtype)
+    y_offset = 1 - x_offset
+
+    corners = [
+        (x1, y1, x_distance, y_distance),
+        (x1 + x_middle, y1 + y_middle,
+            x_distance - x_offset + SIMPLEX_UNSKEW, y_distance - y_offset + SIMPLEX_UNSKEW),
+        (x1 + 1, y1 + 1, x_distance - 1 + 2*SIMPLEX_UNSKEW, y_distance - 1 + 2*SIMPLEX_UNSKEW)
+    ]
+
+    noise = np.zeros(np.broadcast_shapes(x_distance.shape, y_distance.shape), dtype=dtype)
+    for x_index, y_index, x_corner, y_corner in corners:
+        # Every corner only affects positions closer than sqrt(0.5) to it.
+        falloff = 0.5 - x_corner*x_corner - y_corner*y_corner
+        np.maximum(falloff, 0, out=falloff)
+        falloff *= falloff
+        falloff *= falloff
+
+        indices = lattice_lookup(x_index, y_index)
+        falloff *= x_table[indices]*x_corner + y_table[indices]*y_corner
+        noise += falloff
+
+    # Scale the largest possible value to about 1.
+    noise *= 70
+    return noise
+
+
+# Values for value noise. Each grid point gets one of these instead of a gradient vector.
+value_table = np.linspace(-1, 1, len(perm_table))
+
+
+def value_octave(lattice_lookup, x_positions, y_positions, dtype):
+    """Calculates one octave of value noise for a whole grid of positions at once. Each grid
+    point has a random value which is interpolated between. Cheaper than perlin noise but
+    blockier.
+
+    Args:
+        lattice_lookup (function): Takes arrays of grid x and y indices and returns the
+        value_table indices of those grid points.
+        x_positions (np.ndarray): X positions scaled to the gradient grid.
+        y_positions (np.ndarray): Y positions scaled to the gradient grid.
+        dtype (np.dtype): Floating point type the noise is calculated in.
+
+    Returns:
+        np.ndarray: Noise values between -1 and 1 in the broadcast shape of the positions.
+    """
+    values = value_table.astype(dtype)
+
+    # Get the grid cell and the fractional position inside it.
+    x1 = np.floor(x_positions).astype(np.intp)
+    y1 = np.floor(y_positions).astype(np.intp)
+
+    fracx = (x_positions % 1).astype(dtype, copy=False)
+    fracy = (y_positions % 1).astype(dtype, copy=False)
+
+    # Interpolate the four surrounding values.
+    return mylerp(values[lattice_lookup(x1, y1)], values[lattice_lookup(x1, y1+1)],
+                values[lattice_lookup(x1+1, y1)], values[lattice_lookup(x1+1, y1+1)],
+                fade(fracx), fade(fracy))
+
+
+# Every noise backend calculates one octave from a lattice lookup and grid positions.
+noise_backends = {
+    'perlin': perlin_octave,
+    'simplex': simplex_octave,
+    'value': value_octave
+}
+
+# Largest value one octave of each backend can reach.
+backend_amplitude = {
+    'perlin': sqrt_2/2,
+    'simplex': 1,
+    'value': 1
+}
+
+
+def get_noise_backend(noise_backend:str):
+    """Returns the octave function of a noise backend.
+
+    Args:
+        noise_backend (str): Name of the backend. 'perlin', 'simplex' or 'value'.
+
+    Raises:
+        ValueError: noise_backend needs to be one of the backends in noise_backends.
+
+    Returns:
+        function: The octave function.
+    """
+    if not noise_backend in noise_backends:
+        raise ValueError(f'noise_backend needs to be one of {list(noise_backends)}. Provided: {noise_backend}')
+
+    return noise_backends[noise_backend]
+
+
+def backend_extent(noise_backend:str, x_position:float, y_position:float) -> tuple:
+    """Returns how far along x and y the lattice of a noise backend is sampled for a position.
+    Simplex noise samples a skewed grid that reaches further than the position itself.
+
+    Args:
+        noise_backend (str): Name of the backend.
+        x_position (float): X position scaled to the gradient grid.
+        y_position (float): Y position scaled to the gradient grid.
+
+    Returns:
+        tuple: (x, y) position in lattice coordinates.
+    """
+    if noise_backend == 'simplex':
+        skew = (x_position + y_position) * SIMPLEX_SKEW
+        return x_position + skew, y_position + skew
+
+    return x_position, y_position
+
+
+def octave_lattice(gradient_lattice, x_stop:int, height:int, step:float, noise_backend:str = 'perlin'):
+    """Returns a view of the part of the gradient lattice one octave samples. Lower octaves
+    only reach the top left corner of the lattice drawn for the highest octave.
+
+    Args:
+        gradient_lattice (np.ndarray): int8 indices into gradient_table.
+        x_stop (int): Row after the last row that will be sampled.
+        height (int): Height of the noise array.
+        step (float): Grid points per pixel for the octave.
+        noise_backend (str, optional): Name of the backend sampling the lattice. Defaults to 'perlin'.
+
+    Returns:
+        np.ndarray: A view of the gradient lattice. No data is copied.
+    """
+    x_reach, y_reach = backend_extent(noise_backend, (x_stop - 1) * step, (height - 1) * step)
+    return gradient_lattice[:math.floor(x_reach) + 2, :math.floor(y_reach) + 2]
+
+
+# Number of pixels calculated at once. Keeps the temporary arrays of every octave small
+# no matter how large the noise array is.
+CHUNK_PIXELS = 2**18
+
+# Number of rows that share one rectangle when only the pixels inside a mask are calculated.
+MASK_ROWS = 16
+
+# Bands of rows per worker in parallel perlin2d. Only the bands being calculated are held in
+# shared memory, so this is also how many times smaller than the array the extra memory is.
+BANDS_PER_WORKER = 8
+
+
+def add_octaves(noise_band, gradient_lattice, x_start:int, detail:float, octaves:int,
+                noise_backend:str = 'perlin', first_octave:int = 1, y_start:int = 0):
+    """Adds every octave of noise to a band of rows of the noise array. The band is
+    worked through a few rows at a time.
+
+    Args:
+        noise_band (np.ndarray): The rows x_start to x_start + len(noise_band) of the noise array.
+        The band can also be limited to the columns from y_start.
+        gradient_lattice (np.ndarray): int8 indices into gradient_table for every grid point.
+        x_start (int): X coordinate of the first row in the band.
+        detail (float): Detail already scaled to gradient grid points per pixel.
+        octaves (int): Number of octaves to add.
+        noise_backend (str, optional): Name of the noise backend. Defaults to 'perlin'.
+        first_octave (int, optional): First octave to add. The octaves before it are expected to
+        be in the band already. Defaults to 1.
+        y_start (int, optional): Y coordinate of the first column in the band. Defaults to 0.
+    """
+    band_width, height = noise_band.shape
+    chunk_rows = max(1, CHUNK_PIXELS // max(height, 1))
+    noise_octave = get_noise_backend(noise_backend)
+
+    # Pixel coordinates as a column and a row so they broadcast into the full chunk.
+    y_coordinates = np.arange(y_start, y_start + height).reshape(1, height)
+
+    for chunk_start in range(0, band_width, chunk_rows):
+        chunk = noise_band[chunk_start:chunk_start + chunk_rows]
+        chunk_x = x_start + chunk_start
+        x_coordinates = np.arange(chunk_x, chunk_x + len(chunk)).reshape(len(chunk), 1)
+
+        for oct in range(first_octave,octaves+1):
+            effect = 1/2**oct
+            step = detail * 2**oct
+            lattice = octave_lattice(gradient_lattice, chunk_x + len(chunk), y_start + height, step, noise_backend)
+
+            def lattice_lookup(x_indices, y_indices):
+                return lattice[x_indices, y_indices]
+
+            # Calculate in the precision of the noise array.
+            octave_noise = noise_octave(lattice_lookup, x_coordinates*step, y_coordinates*step,
+                                        noise_band.dtype)
+            octave_noise *= effect
+            chunk += octave_noise
+
+
+def masked_rectangles(mask):
+    """Yields rectangles that together cover every True pixel of a mask. Each rectangle is a
+    group of MASK_ROWS rows between the first and last True column of the group, so most of
+    the pixels outside a disc are skipped without listing the masked pixels one by one.
+
+    Args:
+        mask (np.ndarray): Boolean array of shape (width, height).
+
+    Yields:
+        tuple: (x_start, x_stop, y_start, y_stop) of every rectangle.
+    """
+    width, height = mask.shape
+    masked_rows = mask.any(axis=1)
+    first_columns = np.argmax(mask, axis=1)
+    stop_columns = height - np.argmax(mask[:, ::-1], axis=1)
+
+    for x_start in range(0, width, MASK_ROWS):
+        rows = slice(x_start, x_start + MASK_ROWS)
+        group = masked_rows[rows]
+        if not group.any():
+            continue
+        yield (x_start, min(x_start + MASK_ROWS, width),
+                int(first_columns[rows][group].min()), int(stop_columns[rows][group].max()))
+
+
+def add_octaves_masked(noisearray, gradient_lattice, mask, detail:float, octaves:int,
+                        noise_backend:str = 'perlin', first_octave:int = 1, x_start:int = 0):
+    """Adds every octave of noise to the pixels of the noise array inside a mask. The rows are
+    covered by the rectangles of masked_rectangles, so pixels outside the mask but inside a
+    rectangle get noise as well. Callers set those to 0 afterwards.
+
+    Args:
+        noisearray (np.ndarray): Noise array of the same shape as the mask.
+        gradient_lattice (np.ndarray): int8 indices into gradient_table for every grid point.
+        mask (np.ndarray): Boolean array with the pixels to calculate.
+        detail (float): Detail already scaled to gradient grid points per pixel.
+        octaves (int): Number of octaves to add.
+        noise_backend (str, optional): Name of the noise backend. Defaults to 'perlin'.
+        first_octave (int, optional): First octave to add. Defaults to 1.
+        x_start (int, optional): X coordinate of the first row when the noise array and mask are
+        a band of rows of a larger array. Defaults to 0.
+    """
+    for x_first, x_stop, y_start, y_stop in masked_rectangles(mask):
+        add_octaves(noisearray[x_first:x_stop, y_start:y_stop], gradient_lattice, x_start + x_first,
+                    detail, octaves, noise_backend, first_octave, y_start)
+
+
+def normalize_masked(noisearray, mask, noise_range:NoiseRange = None):
+    """Rescales the pixels of a noise array inside a mask to 0-1 in place and sets every pixel
+    outside the mask to 0. No compact copy of the masked pixels is made.
+
+    Args:
+        noisearray (np.ndarray): Array of raw noise between -1-1 to rescale. It is changed in place.
+        mask (np.ndarray): Boolean array of the same shape.
+        noise_range (NoiseRange, optional): Range in 0-1 units that is stretched to 0-1, e.g. from
+        analytic_noise_range. Defaults to None which stretches the min and max inside the mask.
+
+    Returns:
+        np.ndarray: The same array, rescaled.
+    """
+    if not noise_range == None:
+        # The range is in 0-1 units while the noise is still between -1-1.
+        normalize_noise(noisearray, 2*noise_range.minimum - 1, 2*noise_range.maximum - 1)
+    elif mask.any():
+        normalize_noise(noisearray, np.min(noisearray, where=mask, initial=np.inf),
+                        np.max(noisearray, where=mask, initial=-np.inf))
+    np.copyto(noisearray, 0, where=~mask)
+
+    return noisearray
+
+
+def add_octaves_at(noise_samples, gradient_lattice, x_pixels, y_pixels, detail:float, octaves:int,
+                    noise_backend:str = 'perlin', first_octave:int = 1):
+    """Adds every octave of noise to a list of samples at arbitrary pixel coordinates. Only
+    the given pixels are calculated, a few at a time.
+
+    Args:
+        noise_samples (np.ndarray): 1D array with one value per coordinate.
+        gradient_lattice (np.ndarray): int8 indices into gradient_table for every grid point.
+        x_pixels (np.ndarray): X pixel coordinate of every sample.
+        y_pixels (np.ndarray): Y pixel coordinate of every sample.
+        detail (float): Detail already scaled to gradient grid points per pixel.
+        octaves (int): Number of octaves to add.
+        noise_backend (str, optional): Name of the noise backend. Defaults to 'perlin'.
+        first_octave (int, optional): First octave to add. The octaves before it are expected to
+        be in the samples already. Defaults to 1.
+    """
+    noise_octave = get_noise_backend(noise_backend)
+
+    def lattice_lookup(x_indices, y_indices):
+        return gradient_lattice[x_indices, y_indices]
+
+    for chunk_start in range(0, len(noise_samples), CHUNK_PIXELS):
+        chunk = slice(chunk_start, chunk_start + CHUNK_PIXELS)
+
+        for oct in range(first_octave,octaves+1):
+            effect = 1/2**oct
+            step = detail * 2**oct
+
+            octave_noise = noise_octave(lattice_lookup, x_pixels[chunk]*step, y_pixels[chunk]*step,
+                                        noise_samples.dtype)
+            octave_noise *= effect
+            noise_samples[chunk] += octave_noise
+
+
+def create_gradient_lattice(width:int, height:int, detail:float, octaves:int, rng:PlanetRng,
+                            noise_backend:str = 'perlin'):
+    """Draws a 2D gradient grid with random vectors from the permutation table. Only the int8
+    index of each vector is stored, every octave samples a view of the same lattice.
+
+    Args:
+        width (int): Width of the noise array.
+        height (int): Height of the noise array.
+        detail (float): Detail already scaled to gradient grid points per pixel.
+        octaves (int): Number of octaves that will sample the lattice.
+        rng (PlanetRng): Generator the gradients are drawn from.
+        noise_backend (str, optional): Name of the backend sampling the lattice. Defaults to 'perlin'.
+
+    Returns:
+        np.ndarray: int8 indices into gradient_table for every grid point.
+    """
+    lattice_width, lattice_height = backend_extent(noise_backend, width, height)
+    grid_width = math.ceil(lattice_width * detail * (2**octaves))
+    grid_height = math.ceil(lattice_height * detail * (2**octaves))
+    return rng.generator.integers(len(perm_table), size=(grid_width+1, grid_height+1), dtype=np.int8)
+
+
+def perlin_band(shared_name:str, shape:tuple, dtype, gradient_lattice, x_start:int,
+                detail:float, octaves:int, noise_backend:str = 'perlin', mask_band = None):
+    """Worker for parallel perlin2d. Attaches to the shared block of one band of rows and fills
+    it with every octave of noise. Nothing but the arguments is sent between the processes.
+
+    Args:
+        shared_name (str): Name of the shared memory block holding the band.
+        shape (tuple): (rows, height) of the band.
+        dtype (np.dtype): Data type of the noise array.
+        gradient_lattice (np.ndarray): int8 indices into gradient_table for every grid point.
+        x_start (int): X coordinate of the first row of the band.
+        detail (float): Detail already scaled to gradient grid points per pixel.
+        octaves (int): Number of octaves to add.
+        noise_backend (str, optional): Name of the noise backend. Defaults to 'perlin'.
+        mask_band (np.ndarray, optional): The rows of the mask in the band. Only the pixels
+        around it are calculated when given. Defaults to None.
+    """
+    shared = shared_memory.SharedMemory(name=shared_name)
+    try:
+        noise_band = np.ndarray(shape, dtype=dtype, buffer=shared.buf)
+        noise_band.fill(0)
+        if mask_band is None:
+            add_octaves(noise_band, gradient_lattice, x_start, detail, octaves, noise_backend)
+        else:
+            add_octaves_masked(noise_band, gradient_lattice, mask_band, detail, octaves, noise_backend,
+                                x_start=x_start)
+        del noise_band
+    finally:
+        shared.close()
+
+
+def perlin2d(width:int, height:int, detail:int = 1, octaves:int =1, rng:PlanetRng = None,
+            workers:int = 1, normalize:bool = True, dtype = np.float64, out = None,
+            noise_backend:str = 'perlin', mask = None, coordinates = None, noise_range:NoiseRange = None):
     """Creates an array of perlin noise with set dimensions and detail.
 
     Args:
@@ -111,74 +616,699 @@ def perlin2d(width:int, height:int, detail:int = 1, octaves:int =1):
         height (int): Height of the returned array
         detail (int, optional): Higher means higher frequency. Defaults to 1.
         octaves (int, optional): Gives a fractal look. Defaults to 1.
+        rng (PlanetRng, optional): Generator the gradient grid is drawn from. Defaults to an
+        unseeded generator.
+        workers (int, optional): Number of processes. More than one splits the array into bands
+        of rows that are calculated in parallel. The bands are written into the returned array,
+        or out, as they finish. With a mask every worker gets the mask of its band. Can not be
+        combined with coordinates. Defaults to 1.
+        normalize (bool, optional): Stretch the values so the lowest is 0 and the highest 1. If
+        False the values are only moved from -1-1 to 0-1, for callers that rescale them later.
+        Defaults to True.
+        dtype (np.dtype, optional): Floating point type of the returned array. np.float32 halves
+        the memory used. Defaults to np.float64.
+        out (np.ndarray, optional): Array of shape (width, height) to write the noise into
+        instead of allocating a new one. Its dtype is used. Defaults to None.
+        noise_backend (str, optional): 'perlin', 'simplex' or 'value'. Simplex noise evaluates
+        three grid points per pixel instead of four and has no axis aligned artifacts. Value
+        noise is the cheapest but blockiest. Defaults to 'perlin'.
+        mask (np.ndarray, optional): Boolean array of shape (width, height). Noise is only
+        calculated around the rows and columns where it is True and everything outside it is 0.
+        The min and max of the whole field are not known then, so the values are normalized
+        with noise_range instead. Defaults to None.
+        coordinates (tuple, optional): Two 1D integer arrays with the x and y coordinates of the
+        pixels to calculate. The noise is returned as a 1D array with one value per pixel.
+        Can not be combined with mask or more than one worker. Defaults to None.
+        noise_range (NoiseRange, optional): Range in 0-1 units that is stretched to 0-1 when a
+        mask is given. Pass the range of the full field to get the same values as without the
+        mask. Defaults to analytic_noise_range(octaves, noise_backend).
+
+    Raises:
+        TypeError: workers needs to be of type int.
+        ValueError: workers needs to be greater than 0.
+        TypeError: out needs to be a numpy array.
+        ValueError: out needs to be of shape (width, height).
+        TypeError: dtype needs to be a floating point type.
+        ValueError: noise_backend needs to be one of the backends in noise_backends.
+        ValueError: mask and coordinates can not be used together.
+        ValueError: coordinates can not be used with more than one worker.
+        TypeError: mask needs to be a boolean numpy array.
+        ValueError: mask needs to be of shape (width, height).
+        ValueError: coordinates needs to be two 1D integer arrays of the same length inside the array.
 
     Returns:
         [Array]: [Numpy array of perlin noise values between 0-1]
     """
+    if not isinstance(workers, int):
+        raise TypeError(f'workers needs to be of type int. Type provided: {type(workers)}')
+    elif workers < 1:
+        raise ValueError(f'workers needs to be greater than 0. workers provided: {workers}')
+
+    # Get the pixels to calculate if not every pixel is needed.
+    shape = (width, height)
+    x_pixels = None
+    if mask is not None and coordinates is not None:
+        raise ValueError('mask and coordinates can not be used together.')
+    elif coordinates is not None and workers > 1:
+        raise ValueError(f'coordinates can not be used with more than one worker. workers provided: {workers}')
+    elif mask is not None:
+        if not isinstance(mask, np.ndarray):
+            raise TypeError(f'mask needs to be a boolean numpy array. Type provided: {type(mask)}')
+        elif mask.dtype != bool:
+            raise TypeError(f'mask needs to be a boolean numpy array. dtype provided: {mask.dtype}')
+        elif mask.shape != shape:
+            raise ValueError(f'mask needs to be of shape {shape}. Shape provided: {mask.shape}')
+    elif coordinates is not None:
+        x_pixels, y_pixels = (np.asarray(pixels) for pixels in coordinates)
+        if (x_pixels.ndim != 1 or x_pixels.shape != y_pixels.shape
+                or not np.issubdtype(x_pixels.dtype, np.integer) or not np.issubdtype(y_pixels.dtype, np.integer)):
+            raise ValueError('coordinates needs to be two 1D integer arrays of the same length.')
+        elif len(x_pixels) > 0 and (x_pixels.min() < 0 or x_pixels.max() >= width
+                                    or y_pixels.min() < 0 or y_pixels.max() >= height):
+            raise ValueError(f'coordinates needs to be inside an array of shape {shape}.')
+        shape = x_pixels.shape
+
+    if out is not None:
+        if not isinstance(out, np.ndarray):
+            raise TypeError(f'out needs to be a numpy array. Type provided: {type(out)}')
+        elif out.shape != shape:
+            raise ValueError(f'out needs to be of shape {shape}. Shape provided: {out.shape}')
+        dtype = out.dtype
+
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise TypeError(f'dtype needs to be a floating point type. dtype provided: {dtype}')
+
+    get_noise_backend(noise_backend)
+    rng = ensure_rng(rng)
     detail = detail*0.001
-    noisearray = np.zeros((width, height))
 
-    # Create a 2D gradient grid with random vectors from the permutation table
-    grid_width = math.ceil(width * detail * (2**octaves))
-    grid_height = math.ceil(height * detail * (2**octaves))
-    gradient_vector_grid = []
+    gradient_lattice = create_gradient_lattice(width, height, detail, octaves, rng, noise_backend)
 
-    for x in range(grid_width+1):
-        temp = []
+    # Never use more workers than there are rows.
+    workers = min(workers, width)
 
-        for y in range(grid_height+1):
-            temp.append(random.choice(vect_table))
-        gradient_vector_grid.append(temp)
+    if out is None:
+        noisearray = np.zeros(shape, dtype=dtype)
+    else:
+        noisearray = out
+        noisearray.fill(0)
+
+    if x_pixels is not None:
+        add_octaves_at(noisearray, gradient_lattice, x_pixels, y_pixels, detail, octaves, noise_backend)
+    elif workers == 1 and mask is not None:
+        add_octaves_masked(noisearray, gradient_lattice, mask, detail, octaves, noise_backend)
+    elif workers == 1:
+        add_octaves(noisearray, gradient_lattice, 0, detail, octaves, noise_backend)
+    else:
+        # Every band of rows gets its own shared block that is copied into the noise array and
+        # freed as soon as the band is done. Only the bands being calculated are held twice.
+        band_rows = max(1, math.ceil(width / (workers*BANDS_PER_WORKER)))
+        band_starts = iter(range(0, width, band_rows))
+        running = {}
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                while True:
+                    # Keep every worker busy with one band.
+                    while len(running) < workers:
+                        x_start = next(band_starts, None)
+                        if x_start == None:
+                            break
+                        x_stop = min(x_start + band_rows, width)
+                        band_shape = (x_stop - x_start, height)
+                        shared = shared_memory.SharedMemory(create=True, size=max(1, noisearray[x_start:x_stop].nbytes))
+                        band = executor.submit(perlin_band, shared.name, band_shape, dtype, gradient_lattice,
+                                                x_start, detail, octaves, noise_backend,
+                                                None if mask is None else mask[x_start:x_stop])
+                        running[band] = (shared, x_start, x_stop)
+
+                    if not running:
+                        break
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for band in finished:
+                        shared, x_start, x_stop = running.pop(band)
+                        try:
+                            # Raises any exception from the worker.
+                            band.result()
+                            np.copyto(noisearray[x_start:x_stop],
+                                        np.ndarray((x_stop - x_start, height), dtype=dtype, buffer=shared.buf))
+                        finally:
+                            shared.close()
+                            shared.unlink()
+        finally:
+            # Free the bands that were left when a worker failed.
+            for shared, _, _ in running.values():
+                shared.close()
+                shared.unlink()
+
+    if normalize and mask is not None:
+        if noise_range == None:
+            noise_range = analytic_noise_range(octaves, noise_backend)
+        normalize_masked(noisearray, mask, noise_range)
+    elif normalize:
+        # Scale the min-max value between 0-1. Moving the values to 0-1 first is not needed
+        # since the stretch maps the min and max to 0 and 1 either way.
+        if noisearray.size > 0:
+            normalize_noise(noisearray, np.min(noisearray), np.max(noisearray))
+    else:
+        # Changing values from -1 to 1 to 0-1.
+        # This can be done by increasing value by 1 and dividing by 2.
+        noisearray += 1
+        noisearray /= 2
+        if mask is not None:
+            np.copyto(noisearray, 0, where=~mask)
+
+    return noisearray
+
+# Constants for the lattice hash. Large odd numbers that spread neighbouring grid points
+# far apart before the bits are mixed.
+HASH_PRIME_X = np.uint64(0x9E3779B97F4A7C15)
+HASH_PRIME_Y = np.uint64(0xC2B2AE3D27D4EB4F)
+HASH_PRIME_Z = np.uint64(0x165667B19E3779F9)
+HASH_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+HASH_MIX_2 = np.uint64(0x94D049BB133111EB)
+HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def lattice_hash(seed:int, x_indices, y_indices, z_indices = None, table_size:int = len(perm_table)):
+    """Hashes grid coordinates into an index of the gradient table. The same seed and
+    coordinates always give the same index, so a grid of any size never has to be stored.
+
+    Args:
+        seed (int): Seed of the noise field.
+        x_indices (np.ndarray): Integer x coordinates of the grid points.
+        y_indices (np.ndarray): Integer y coordinates of the grid points.
+        z_indices (np.ndarray, optional): Integer z coordinates for a 3D grid. Defaults to None.
+        table_size (int, optional): Number of entries in the table the indices point into.
+        Defaults to len(perm_table).
+
+    Returns:
+        np.ndarray: int8 indices into gradient_table in the broadcast shape of the coordinates.
+    """
+    # Negative coordinates wrap around to large unsigned values which is fine for hashing.
+    # Viewing the int64 bits as uint64 does that without copying.
+    h = np.asarray(x_indices, dtype=np.int64).view(np.uint64) * HASH_PRIME_X
+    h = h ^ (np.asarray(y_indices, dtype=np.int64).view(np.uint64) * HASH_PRIME_Y)
+    if z_indices is not None:
+        h ^= np.asarray(z_indices, dtype=np.int64).view(np.uint64) * HASH_PRIME_Z
+    h ^= np.uint64(seed & HASH_MASK)
+
+    # Mix the bits (splitmix64 finalizer).
+    h ^= h >> np.uint64(30)
+    h *= HASH_MIX_1
+    h ^= h >> np.uint64(27)
+    h *= HASH_MIX_2
+    h ^= h >> np.uint64(31)
+
+    return (h % np.uint64(table_size)).astype(np.int8)
+
+
+def perlin2d_window(seed:int, x_start:int, y_start:int, width:int, height:int,
+                    detail:int = 1, octaves:int = 1, noise_range:NoiseRange = None,
+                    noise_backend:str = 'perlin'):
+    """Calculates a rectangular window of an unbounded perlin noise field. The gradient
+    vectors come from a hash of the grid coordinates instead of a stored grid. Windows that
+    are next to each other therefore line up exactly and can be calculated in any order.
+    Unlike perlin2d the values are not stretched to the min/max of the window, that would
+    make neighbouring windows differ. Pass a NoiseRange to collect the range of every window
+    and normalize them together afterwards, or use analytic_noise_range.
+
+    Args:
+        seed (int): Seed of the noise field.
+        x_start (int): X pixel coordinate of the first column in the window.
+        y_start (int): Y pixel coordinate of the first row in the window.
+        width (int): Width of the window.
+        height (int): Height of the window.
+        detail (int, optional): Higher means higher frequency. Defaults to 1.
+        octaves (int, optional): Gives a fractal look. Defaults to 1.
+        noise_range (NoiseRange, optional): Range that is widened with the values of this
+        window. Defaults to None.
+        noise_backend (str, optional): 'perlin', 'simplex' or 'value'. Defaults to 'perlin'.
+
+    Raises:
+        TypeError: seed, coordinates and dimensions needs to be of type int.
+        ValueError: width and height needs to be greater than 0.
+        ValueError: noise_backend needs to be one of the backends in noise_backends.
+
+    Returns:
+        np.ndarray: Numpy array of shape (width, height) with noise values between 0-1.
+    """
+    if not all(isinstance(value, int) for value in [seed, x_start, y_start, width, height]):
+        raise TypeError('seed, x_start, y_start, width and height needs to be of type int.')
+
+    if width < 1 or height < 1:
+        raise ValueError(f'width and height needs to be greater than 0. Provided: ({width}, {height})')
+
+    noise_octave = get_noise_backend(noise_backend)
+    detail = detail*0.001
+    noisearray = np.zeros((width, height))
+
+    # Use global pixel coordinates so the window is a cut out of the same field.
+    x_coordinates = np.arange(x_start, x_start + width).reshape(width, 1)
+    y_coordinates = np.arange(y_start, y_start + height).reshape(1, height)
 
     for oct in range(1,octaves+1):
         effect = 1/2**oct
         step = detail * 2**oct
-        for x in range(width):
-            for y in range(height):
-                # Get the four surrounding vectors      - OBS needs to be e.g. x*step floored
-                x1 = math.floor(x*step)
-                y1 = math.floor(y*step)
-                v1 = gradient_vector_grid[x1][y1]
-                v2 = gradient_vector_grid[x1][y1+1]
-                v3 = gradient_vector_grid[x1+1][y1]
-                v4 = gradient_vector_grid[x1+1][y1+1]
-
-                # Get the distance vectors
-                dist1 = (x*step%1, y*step%1)
-                dist2 = (x*step%1, y*step%1-1)
-                dist3 = (x*step%1-1, y*step%1)
-                dist4 = (x*step%1-1, y*step%1-1)
-
-                # Get the dot procuct for each point withing the vectors
-                dot1 = getdotproduct((v1.x,v1.y), dist1)
-                dot2 = getdotproduct((v2.x,v2.y), dist2)
-                dot3 = getdotproduct((v3.x,v3.y), dist3)
-                dot4 = getdotproduct((v4.x,v4.y), dist4)
-
-                # Interpolate the points but fade the fractional distances.
-                fractionx = fade(x*step%1)
-                fractiony = fade(y*step%1)
-
-                point = mylerp(dot1, dot2, dot3, dot4, fractionx, fractiony)
-
-                noisearray[x][y] += point * effect
+
+        x_positions = x_coordinates*step
+        y_positions = y_coordinates*step
+
+        # Hash only the part of the lattice the window covers. Every octave gets its own lattice.
+        octave_seed = (seed + oct * int(HASH_PRIME_X)) & HASH_MASK
+        first_x, first_y = backend_extent(noise_backend, x_positions[0, 0], y_positions[0, 0])
+        last_x, last_y = backend_extent(noise_backend, x_positions[-1, 0], y_positions[0, -1])
+        grid_x = math.floor(first_x)
+        grid_y = math.floor(first_y)
+        lattice_x = np.arange(grid_x, math.floor(last_x) + 2).reshape(-1, 1)
+        lattice_y = np.arange(grid_y, math.floor(last_y) + 2).reshape(1, -1)
+        window_lattice = lattice_hash(octave_seed, lattice_x, lattice_y)
+
+        def lattice_lookup(x_indices, y_indices):
+            return window_lattice[x_indices - grid_x, y_indices - grid_y]
+
+        noisearray += noise_octave(lattice_lookup, x_positions, y_positions, noisearray.dtype) * effect
 
     # Changing values from -1 to 1 to 0-1.
-    # This can be done by increasing value by 1 and dividing by 2.
-    for x in range(width):
-        for y in range(height):
-            noisearray[x][y] += 1
-            noisearray[x][y] /= 2
-
-    # Scale the min-max value between 0-1
-    min, max = np.min(noisearray), np.max(noisearray)
-    
-    for x in range(width):
-        for y in range(height):
-            noisearray[x][y] = rescale_range(min, max, 0.0, 1.0, noisearray[x][y])
-    
+    noisearray += 1
+    noisearray /= 2
+
+    if not noise_range == None:
+        noise_range.update(noisearray)
+
     return noisearray
 
+
+def perlin2d_tile(seed:int, tile_x:int, tile_y:int, tile_size:int, detail:int = 1, octaves:int = 1,
+                    noise_range:NoiseRange = None, noise_backend:str = 'perlin'):
+    """Calculates one square tile of an unbounded perlin noise field. Tile (0, 0) starts at
+    pixel (0, 0), tile (1, 0) starts at pixel (tile_size, 0) and so on. Tiles with the same
+    seed, tile_size, detail and octaves can be put next to each other without seams.
+
+    Args:
+        seed (int): Seed of the noise field.
+        tile_x (int): Tile column. May be negative.
+        tile_y (int): Tile row. May be negative.
+        tile_size (int): Width and height of the tile in pixels.
+        detail (int, optional): Higher means higher frequency. Defaults to 1.
+        octaves (int, optional): Gives a fractal look. Defaults to 1.
+        noise_range (NoiseRange, optional): Range that is widened with the values of this
+        tile. Defaults to None.
+        noise_backend (str, optional): 'perlin', 'simplex' or 'value'. Defaults to 'perlin'.
+
+    Raises:
+        TypeError: tile_x, tile_y and tile_size needs to be of type int.
+
+    Returns:
+        np.ndarray: Numpy array of shape (tile_size, tile_size) with noise values between 0-1.
+    """
+    if not all(isinstance(value, int) for value in [tile_x, tile_y, tile_size]):
+        raise TypeError('tile_x, tile_y and tile_size needs to be of type int.')
+
+    return perlin2d_window(seed, tile_x * tile_size, tile_y * tile_size, tile_size, tile_size,
+                            detail, octaves, noise_range, noise_backend)
+
+
+# Gradients for 3D noise. The twelve vectors from the center of a cube to its edges.
+gradient_table_3d = np.array([(1,1,0), (-1,1,0), (1,-1,0), (-1,-1,0),
+                            (1,0,1), (-1,0,1), (1,0,-1), (-1,0,-1),
+                            (0,1,1), (0,-1,1), (0,1,-1), (0,-1,-1)], dtype=float)
+
+
+def perlin3d_octave(lattice_lookup, x_positions, y_positions, z_positions, dtype):
+    """Calculates one octave of 3D perlin noise for arrays of positions.
+
+    Args:
+        lattice_lookup (function): Takes arrays of grid x, y and z indices and returns the
+        gradient_table_3d indices of those grid points.
+        x_positions (np.ndarray): X positions scaled to the gradient grid.
+        y_positions (np.ndarray): Y positions scaled to the gradient grid.
+        z_positions (np.ndarray): Z positions scaled to the gradient grid.
+        dtype (np.dtype): Floating point type the noise is calculated in.
+
+    Returns:
+        np.ndarray: Noise values between -1 and 1 in the broadcast shape of the positions.
+    """
+    x_table, y_table, z_table = gradient_table_3d.T.astype(dtype)
+
+    # Get the grid cell and the fractional position inside it.
+    x1 = np.floor(x_positions).astype(np.intp)
+    y1 = np.floor(y_positions).astype(np.intp)
+    z1 = np.floor(z_positions).astype(np.intp)
+
+    fracx = (x_positions - x1).astype(dtype, copy=False)
+    fracy = (y_positions - y1).astype(dtype, copy=False)
+    fracz = (z_positions - z1).astype(dtype, copy=False)
+
+    # The grid indices and distances of the near and far corner along each axis.
+    x_corners = [(x1, fracx), (x1 + 1, fracx - 1)]
+    y_corners = [(y1, fracy), (y1 + 1, fracy - 1)]
+    z_corners = [(z1, fracz), (z1 + 1, fracz - 1)]
+
+    # Get the dot product between each of the eight corners gradient vector and the distance
+    # vector to it.
+    dots = {}
+    for i, (x_index, x_distance) in enumerate(x_corners):
+        for j, (y_index, y_distance) in enumerate(y_corners):
+            for k, (z_index, z_distance) in enumerate(z_corners):
+                indices = lattice_lookup(x_index, y_index, z_index)
+                dot = x_table[indices]*x_distance
+                dot += y_table[indices]*y_distance
+                dot += z_table[indices]*z_distance
+                dots[i, j, k] = dot
+
+    # Interpolate the two z layers and then between them.
+    fadex = fade(fracx)
+    fadey = fade(fracy)
+    lower = mylerp(dots[0,0,0], dots[0,1,0], dots[1,0,0], dots[1,1,0], fadex, fadey)
+    upper = mylerp(dots[0,0,1], dots[0,1,1], dots[1,0,1], dots[1,1,1], fadex, fadey)
+
+    return lower + fade(fracz)*(upper - lower)
+
+
+def sphere_disc(width:int, height:int, radius:float):
+    """Creates a boolean mask that is True for every pixel inside a disc centered in the array.
+    The disc is centered the same way as the planet in to_planet_shape.
+
+    Args:
+        width (int): Width of the array.
+        height (int): Height of the array.
+        radius (float): Radius of the disc in pixels.
+
+    Returns:
+        np.ndarray: Boolean array of shape (width, height).
+    """
+    x = np.arange(width).reshape(width, 1) - width/2
+    y = np.arange(height).reshape(1, height) - height/2
+    return x**2+y**2 <= radius**2
+
+
+def add_sphere_octaves(noise_samples, seed:int, x_pixels, y_pixels, width:int, height:int,
+                        radius:float, detail:float, octaves:int, first_octave:int = 1):
+    """Adds every octave of 3D noise to samples of a sphere seen from the front. Every pixel is
+    projected onto the hemisphere facing the viewer and the noise is sampled there.
+
+    Args:
+        noise_samples (np.ndarray): 1D array with one value per pixel.
+        seed (int): Seed of the noise field.
+        x_pixels (np.ndarray): X pixel coordinate of every sample. Needs to be inside the disc.
+        y_pixels (np.ndarray): Y pixel coordinate of every sample. Needs to be inside the disc.
+        width (int): Width of the array the sphere is centered in.
+        height (int): Height of the array the sphere is centered in.
+        radius (float): Radius of the sphere in pixels.
+        detail (float): Detail already scaled to gradient grid points per pixel.
+        octaves (int): Number of octaves to add.
+        first_octave (int, optional): First octave to add. The octaves before it are expected to
+        be in the samples already. Defaults to 1.
+    """
+    for chunk_start in range(0, len(noise_samples), CHUNK_PIXELS):
+        chunk = slice(chunk_start, chunk_start + CHUNK_PIXELS)
+
+        # Project the pixels onto the sphere.
+        sphere_x = x_pixels[chunk] - width/2
+        sphere_y = y_pixels[chunk] - height/2
+        sphere_z = np.sqrt(np.maximum(radius**2 - (sphere_x**2 + sphere_y**2), 0))
+
+        for oct in range(first_octave,octaves+1):
+            effect = 1/2**oct
+            step = detail * 2**oct
+            octave_seed = (seed + oct * int(HASH_PRIME_X)) & HASH_MASK
+
+            def lattice_lookup(x_indices, y_indices, z_indices):
+                return lattice_hash(octave_seed, x_indices, y_indices, z_indices, len(gradient_table_3d))
+
+            octave_noise = perlin3d_octave(lattice_lookup, sphere_x*step, sphere_y*step, sphere_z*step,
+                                            noise_samples.dtype)
+            octave_noise *= effect
+            noise_samples[chunk] += octave_noise
+
+
+def perlin_sphere(width:int, height:int, radius:float, detail:int = 1, octaves:int = 1,
+                    rng:PlanetRng = None, normalize:bool = True, dtype = np.float64, out = None):
+    """Creates an array of noise for a sphere seen from the front. Only the pixels inside the
+    disc of the sphere are calculated. Each is projected onto the visible hemisphere and 3D
+    noise is sampled there, so the terrain curves with the planet and has no seams. The work
+    scales with the area of the disc instead of the whole array.
+
+    Args:
+        width (int): Width of the returned array.
+        height (int): Height of the returned array.
+        radius (float): Radius of the sphere in pixels. The sphere is centered in the array.
+        detail (int, optional): Higher means higher frequency. Defaults to 1.
+        octaves (int, optional): Gives a fractal look. Defaults to 1.
+        rng (PlanetRng, optional): Generator the noise seed is drawn from. Defaults to an
+        unseeded generator.
+        normalize (bool, optional): Stretch the values inside the disc so the lowest is 0 and the
+        highest 1. If False the values are only moved from -1-1 to 0-1. Defaults to True.
+        dtype (np.dtype, optional): Floating point type of the returned array. Defaults to np.float64.
+        out (np.ndarray, optional): Array of shape (width, height) to write the noise into
+        instead of allocating a new one. Its dtype is used. Defaults to None.
+
+    Raises:
+        ValueError: radius can not be negative.
+        TypeError: out needs to be a numpy array.
+        ValueError: out needs to be of shape (width, height).
+        TypeError: dtype needs to be a floating point type.
+
+    Returns:
+        np.ndarray: Numpy array of shape (width, height). Noise values between 0-1 inside the
+        disc and 0 outside of it.
+    """
+    if radius < 0:
+        raise ValueError(f'radius can not be negative. radius provided: {radius}')
+
+    if out is not None:
+        if not isinstance(out, np.ndarray):
+            raise TypeError(f'out needs to be a numpy array. Type provided: {type(out)}')
+        elif out.shape != (width, height):
+            raise ValueError(f'out needs to be of shape {(width, height)}. Shape provided: {out.shape}')
+        dtype = out.dtype
+
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise TypeError(f'dtype needs to be a floating point type. dtype provided: {dtype}')
+
+    rng = ensure_rng(rng)
+    seed = int(rng.generator.integers(2**63))
+    detail = detail*0.001
+
+    if out is None:
+        noisearray = np.zeros((width, height), dtype=dtype)
+    else:
+        noisearray = out
+        noisearray.fill(0)
+
+    # Get the pixels inside the disc.
+    x_pixels, y_pixels = np.nonzero(sphere_disc(width, height, radius))
+    if len(x_pixels) == 0:
+        return noisearray
+
+    disc_noise = np.zeros(len(x_pixels), dtype=dtype)
+    add_sphere_octaves(disc_noise, seed, x_pixels, y_pixels, width, height, radius, detail, octaves)
+
+    if normalize:
+        normalize_noise(disc_noise, np.min(disc_noise), np.max(disc_noise))
+    else:
+        # Changing values from -1 to 1 to 0-1.
+        disc_noise += 1
+        disc_noise /= 2
+
+    noisearray[x_pixels, y_pixels] = disc_noise
+
+    return noisearray
+
+
+def progressive_noise(add_samples, add_masked, mask, detail:float, octaves:int, preview_scale:int, dtype,
+                        stage_range = None):
+    """Yields noise in stages that get closer to the final result. First low resolution
+    previews with only the octaves they can show, each with twice the resolution of the one
+    before, and then the full resolution one octave at a time. The last stage is the finished
+    noise. Stop iterating to skip the rest of the work.
+
+    Args:
+        add_samples (function): Takes a 1D sample array, x and y pixel coordinates, the first and
+        the last octave and adds those octaves of noise to the samples. Used for the previews.
+        add_masked (function): Takes a full resolution noise array, the first and the last octave
+        and adds those octaves of noise to the pixels inside the mask.
+        mask (np.ndarray): Boolean array of shape (width, height) with the pixels to calculate.
+        detail (float): Detail already scaled to gradient grid points per pixel.
+        octaves (int): Number of octaves in the finished noise.
+        preview_scale (int): Pixels per preview pixel in the first preview. 1 skips the previews.
+        dtype (np.dtype): Floating point type of the noise.
+        stage_range (function, optional): Takes the number of octaves in a stage and returns the
+        NoiseRange it is normalized with. Defaults to None which stretches the min and max of
+        the masked pixels of every stage.
+
+    Yields:
+        tuple: (noisearray, scale, octaves) with the noise of the stage between 0-1, the pixels
+        per noise pixel and the number of octaves in it.
+    """
+    scale = preview_scale
+    while scale > 1:
+        preview_mask = mask[::scale, ::scale]
+        x_pixels, y_pixels = np.nonzero(preview_mask)
+
+        # Octaves with less than two preview pixels per grid cell can not be seen in the preview.
+        preview_octaves = max(1, sum(1 for oct in range(1, octaves+1) if detail * 2**oct * scale <= 0.5))
+
+        samples = np.zeros(len(x_pixels), dtype=dtype)
+        add_samples(samples, x_pixels*scale, y_pixels*scale, 1, preview_octaves)
+        if not stage_range == None:
+            noise_range = stage_range(preview_octaves)
+            normalize_noise(samples, 2*noise_range.minimum - 1, 2*noise_range.maximum - 1)
+        elif samples.size > 0:
+            normalize_noise(samples, np.min(samples), np.max(samples))
+
+        preview = np.zeros(preview_mask.shape, dtype=dtype)
+        preview[x_pixels, y_pixels] = samples
+        yield preview, scale, preview_octaves
+
+        scale //= 2
+
+    # Refine the full resolution one octave at a time.
+    noise_sum = np.zeros(mask.shape, dtype=dtype)
+    for oct in range(1,octaves+1):
+        add_masked(noise_sum, oct, oct)
+
+        # Keep the raw sum for the next octave unless this was the last one.
+        noisearray = noise_sum if oct == octaves else noise_sum.copy()
+        noise_range = None if stage_range == None else stage_range(oct)
+        yield normalize_masked(noisearray, mask, noise_range), 1, oct
+
+
+def validate_progressive(preview_scale:int, dtype):
+    """Validates the arguments shared by the progressive noise generators.
+
+    Args:
+        preview_scale (int): Pixels per preview pixel in the first preview.
+        dtype (np.dtype): Floating point type of the noise.
+
+    Raises:
+        TypeError: preview_scale needs to be of type int.
+        ValueError: preview_scale needs to be greater than 0.
+        TypeError: dtype needs to be a floating point type.
+
+    Returns:
+        np.dtype: The validated dtype.
+    """
+    if not isinstance(preview_scale, int):
+        raise TypeError(f'preview_scale needs to be of type int. Type provided: {type(preview_scale)}')
+    elif preview_scale < 1:
+        raise ValueError(f'preview_scale needs to be greater than 0. preview_scale provided: {preview_scale}')
+
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise TypeError(f'dtype needs to be a floating point type. dtype provided: {dtype}')
+
+    return dtype
+
+
+def perlin2d_progressive(width:int, height:int, detail:int = 1, octaves:int = 1, rng:PlanetRng = None,
+                        preview_scale:int = 4, dtype = np.float64, noise_backend:str = 'perlin',
+                        mask = None):
+    """Generator version of perlin2d that yields low resolution previews before the full noise.
+    See progressive_noise. The last stage is the same as perlin2d with the same generator.
+
+    Args:
+        width (int): Width of the finished array.
+        height (int): Height of the finished array.
+        detail (int, optional): Higher means higher frequency. Defaults to 1.
+        octaves (int, optional): Gives a fractal look. Defaults to 1.
+        rng (PlanetRng, optional): Generator the gradient grid is drawn from. Defaults to an
+        unseeded generator.
+        preview_scale (int, optional): Pixels per preview pixel in the first preview. Halved for
+        every following preview. Defaults to 4.
+        dtype (np.dtype, optional): Floating point type of the noise. Defaults to np.float64.
+        noise_backend (str, optional): 'perlin', 'simplex' or 'value'. Defaults to 'perlin'.
+        mask (np.ndarray, optional): Boolean array of shape (width, height). Noise is only
+        calculated where it is True. Every stage is then normalized with the analytic_noise_range
+        of its octaves, like perlin2d with a mask. Defaults to None.
+
+    Raises:
+        ValueError: mask needs to be of shape (width, height).
+
+    Yields:
+        tuple: (noisearray, scale, octaves). See progressive_noise.
+    """
+    dtype = validate_progressive(preview_scale, dtype)
+    get_noise_backend(noise_backend)
+
+    # Without a mask every stage is stretched over the whole field like perlin2d.
+    stage_range = None
+    if mask is None:
+        mask = np.ones((width, height), dtype=bool)
+    elif mask.shape != (width, height):
+        raise ValueError(f'mask needs to be of shape {(width, height)}. Shape provided: {mask.shape}')
+    else:
+        stage_range = lambda stage_octaves: analytic_noise_range(stage_octaves, noise_backend)
+
+    rng = ensure_rng(rng)
+    detail = detail*0.001
+    gradient_lattice = create_gradient_lattice(width, height, detail, octaves, rng, noise_backend)
+
+    def add_samples(samples, x_pixels, y_pixels, first_octave, last_octave):
+        add_octaves_at(samples, gradient_lattice, x_pixels, y_pixels, detail, last_octave, noise_backend,
+                        first_octave)
+
+    def add_masked(noisearray, first_octave, last_octave):
+        add_octaves_masked(noisearray, gradient_lattice, mask, detail, last_octave, noise_backend,
+                            first_octave)
+
+    yield from progressive_noise(add_samples, add_masked, mask, detail, octaves, preview_scale, dtype,
+                                stage_range)
+
+
+def perlin_sphere_progressive(width:int, height:int, radius:float, detail:int = 1, octaves:int = 1,
+                                rng:PlanetRng = None, preview_scale:int = 4, dtype = np.float64):
+    """Generator version of perlin_sphere that yields low resolution previews before the full
+    noise. See progressive_noise. The last stage is the same as perlin_sphere with the same
+    generator.
+
+    Args:
+        width (int): Width of the finished array.
+        height (int): Height of the finished array.
+        radius (float): Radius of the sphere in pixels.
+        detail (int, optional): Higher means higher frequency. Defaults to 1.
+        octaves (int, optional): Gives a fractal look. Defaults to 1.
+        rng (PlanetRng, optional): Generator the noise seed is drawn from. Defaults to an
+        unseeded generator.
+        preview_scale (int, optional): Pixels per preview pixel in the first preview. Halved for
+        every following preview. Defaults to 4.
+        dtype (np.dtype, optional): Floating point type of the noise. Defaults to np.float64.
+
+    Raises:
+        ValueError: radius can not be negative.
+
+    Yields:
+        tuple: (noisearray, scale, octaves). See progressive_noise.
+    """
+    dtype = validate_progressive(preview_scale, dtype)
+    if radius < 0:
+        raise ValueError(f'radius can not be negative. radius provided: {radius}')
+
+    rng = ensure_rng(rng)
+    seed = int(rng.generator.integers(2**63))
+    detail = detail*0.001
+
+    def add_samples(samples, x_pixels, y_pixels, first_octave, last_octave):
+        add_sphere_octaves(samples, seed, x_pixels, y_pixels, width, height, radius, detail, last_octave,
+                            first_octave)
+
+    # Only the pixels of one rectangle of the disc are listed at a time.
+    disc = sphere_disc(width, height, radius)
+    def add_masked(noisearray, first_octave, last_octave):
+        for x_start, x_stop, y_start, y_stop in masked_rectangles(disc):
+            x_pixels, y_pixels = np.nonzero(disc[x_start:x_stop, y_start:y_stop])
+            x_pixels += x_start
+            y_pixels += y_start
+            samples = noisearray[x_pixels, y_pixels]
+            add_samples(samples, x_pixels, y_pixels, first_octave, last_octave)
+            noisearray[x_pixels, y_pixels] = samples
+
+    yield from progressive_noise(add_samples, add_masked, disc, detail, octaves, preview_scale, dtype)
+
+
 if __name__ == "__main__":
     # Generation settings
     width = 1000
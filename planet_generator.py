@@ -1,29 +1,240 @@
 # Generates a planet using perlin noise and a
 # serial string from the Traveler 2nd edition
 from math import sqrt
+from functools import lru_cache
 import perlin2d as perlin
 import numpy as np
-import random
 import colors
 from PIL import Image
-from PIL import ImageFont
 from PIL import ImageDraw
 import os
 import legend_creator
+from font_cache import get_font
+from planet_rng import PlanetRng
+from planet_rng import ensure_rng
+from planetary_tables import atmosphere_table
+from planetary_tables import atmosphere_temperature_modifier
+from planetary_tables import starport_letters
 
 
 
+class PlanetWorkspace:
+    """Preallocated arrays for generating planets of one size. Reusing a workspace for
+    several planets avoids allocating new full size arrays for every planet.
+    Observe that the arrays are overwritten by the next planet. Copy any result that
+    needs to be kept.
+    """
+    def __init__(self, width: int, height: int, dtype = np.float32):
+        """Allocates the noise and image arrays.
+
+        Args:
+            width (int): Width of the planet image.
+            height (int): Height of the planet image.
+            dtype (np.dtype, optional): Floating point type of the noise array.
+            Defaults to np.float32.
+
+        Raises:
+            TypeError: width and height needs to be of type int.
+            ValueError: width and height needs to be greater than 0.
+        """
+        if not all(isinstance(value, int) for value in [width, height]):
+            raise TypeError(f'width and height needs to be of type int. Provided: ({type(width)}, {type(height)})')
+        elif width < 1 or height < 1:
+            raise ValueError(f'width and height needs to be greater than 0. Provided: ({width}, {height})')
+
+        self.width = width
+        self.height = height
+        self.noise = np.zeros((width, height), dtype=dtype)
+        self.image = np.zeros((width, height, 4), dtype=np.uint8)
+        self.bands = np.zeros((width, height), dtype=np.uint8)
+
+
+# Number of alpha levels an atmosphere gets in an indexed image.
+ATMOSPHERE_LEVELS = 32
+
+# Most colors a station sprite is reduced to in an indexed image.
+STATION_COLORS = 128
+
+# The hexadecimal UPP values in string order with the highest value each can take.
+UPP_FIELDS = (  'starport_quality',
+                'size',
+                'atmosphere_type',
+                'hydrographic_percentage',
+                'population',
+                'government_type',
+                'law_level')
+UPP_LIMITS = (14, 10, 15, 10, 12, 15, 15)
+
+# Why an UPP string is invalid, indexed by the error codes of decode_upp_strings. The codes from
+# 3 on follow UPP_FIELDS.
+UPP_ERRORS = (  'An UPP string is 9 or 10 characters long.',
+                'Tech level needs to be an integer between 0-99 separated by a "-" hyphen.',
+                'The UPP needs to be seven hexadecimal numbers followed by a hyphen.',
+                'Starport quality must be X or between A-E.',
+                'Planet size needs to be between 0-A.',
+                'Atmosphere types can only range between 0-F.',
+                'Hydrographic percentage must range beetween 0-A.',
+                'Population must range beetween 0-C.',
+                'Goverment type must range beetween 0-F.',
+                'Law level must range beetween 0-F.')
+
+# Temperature classes and the highest temperature roll of each. Rolls above the last limit are boiling.
+TEMPERATURE_CLASSES = ('frozen', 'cold', 'temperate', 'hot', 'boiling')
+TEMPERATURE_LIMITS = (2, 4, 9, 11)
+
+# Value of every hexadecimal ascii character and -1 for any other character.
+HEX_VALUES = np.full(256, -1, dtype=np.int8)
+HEX_VALUES[np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)] = np.arange(16)
+HEX_VALUES[np.frombuffer(b'abcdef', dtype=np.uint8)] = np.arange(10, 16)
+
+
+class IndexedImage:
+    """A planet image stored as one uint8 palette index per pixel instead of four RGBA values.
+    A planet only has a handful of terrain colors, an atmosphere gradient and a station, which
+    fit in the 256 colors of a palette. The RGBA colors are only applied when the image is
+    converted or saved.
+    """
+    def __init__(self, indices, palette):
+        """Creates the image from palette indices and the palette they point into.
+
+        Args:
+            indices (np.ndarray): uint8 array of shape (width, height).
+            palette (np.ndarray): RGBA rows of the palette. Row 0 should be transparent.
+
+        Raises:
+            TypeError: indices needs to be a uint8 numpy array.
+            ValueError: palette can have at most 256 colors.
+        """
+        if not isinstance(indices, np.ndarray) or indices.dtype != np.uint8:
+            raise TypeError(f'indices needs to be a uint8 numpy array. Type provided: {type(indices)}')
+        elif len(palette) > 256:
+            raise ValueError(f'palette can have at most 256 colors. Colors provided: {len(palette)}')
+
+        self.indices = indices
+        self.palette = [tuple(int(value) for value in color) for color in palette]
+
+    def add_colors(self, rgba_colors):
+        """Adds colors to the end of the palette.
+
+        Args:
+            rgba_colors (np.ndarray): RGBA rows to add.
+
+        Raises:
+            ValueError: If the palette would have more than 256 colors.
+
+        Returns:
+            np.ndarray: uint8 palette index of every added color.
+        """
+        first_index = len(self.palette)
+        if first_index + len(rgba_colors) > 256:
+            raise ValueError(f'The palette is full. {len(rgba_colors)} colors does not fit after {first_index} colors.')
+
+        self.palette.extend(tuple(int(value) for value in color) for color in rgba_colors)
+        return np.arange(first_index, len(self.palette), dtype=np.uint8)
+
+    def lookup_table(self):
+        """Returns the palette as a uint8 array of shape (colors, 4)."""
+        return np.array(self.palette, dtype=np.uint8).reshape(-1, 4)
+
+    def to_rgba(self):
+        """Returns the image as an RGBA array of shape (width, height, 4)."""
+        return np.take(self.lookup_table(), self.indices, axis=0)
+
+    def to_image(self):
+        """Returns the image as a PIL "P" mode image. The alpha of the palette is kept as a
+        transparency table when saved as PNG."""
+        image = Image.fromarray(self.indices, 'P')
+        image.putpalette(self.lookup_table().tobytes(), 'RGBA')
+        return image
+
+
+def planet_to_image(planet_world):
+    """Converts a planet to a PIL image.
+
+    Args:
+        planet_world (np.ndarray, IndexedImage): An RGBA planet array or an indexed planet.
+
+    Returns:
+        Image.Image: An RGBA image or a palette image for indexed planets.
+    """
+    if isinstance(planet_world, IndexedImage):
+        return planet_world.to_image()
+
+    return Image.fromarray(planet_world, 'RGBA')
+
+
 # Helper functions
-def color_array(height_array, color_palette):
+def palette_lookup_table(color_palette):
+    """Creates an RGBA lookup table for a color palette. Row 0 is transparent for heights outside
+    of every band and row n is the color of the n:th band in the palette.
+
+    Args:
+        color_palette (List): List with (color, height upper limit, land type) tuples.
+
+    Returns:
+        np.ndarray: uint8 array of shape (len(color_palette) + 1, 4).
+    """
+    lookup_table = np.zeros((len(color_palette) + 1, 4), dtype=np.uint8)
+    lookup_table[1:] = colors.get_rgb_array([color for color, _, _ in color_palette])
+
+    return lookup_table
+
+
+def classify_heights(height_array, color_palette, out=None):
+    """Sorts every height into the band of the color palette it belongs to. A height belongs
+    to a band if it is above the upper limit of the band before and at most the upper limit
+    of its own band. 0 is the lowest normalized height and belongs to the first band. Heights
+    below 0 and above the last band belong to no band.
+
+    Args:
+        height_array (np.ndarray): Numpy array with perlin noise between 0-1
+        color_palette (List): List with (color, height upper limit, land type) tuples ordered
+        from the lowest to the highest band.
+        out (np.ndarray, optional): uint8 array of the same shape as height_array to write the
+        band indices into. Defaults to None.
+
+    Raises:
+        ValueError: The bands of the color palette needs to be ordered by height.
+
+    Returns:
+        np.ndarray: uint8 array with the band of every height. 0 for no band and n for the
+        n:th band in the palette.
+    """
+    # Compare in the precision of the height array.
+    upper_limits = np.array([upper_limit for _, upper_limit, _ in color_palette], dtype=height_array.dtype)
+    if np.any(np.diff(upper_limits) < 0):
+        raise ValueError(f'The bands of the color palette needs to be ordered by height. Provided: {upper_limits}')
+
+    if out is None:
+        bands = np.ones(height_array.shape, dtype=np.uint8)
+    else:
+        bands = out
+        bands.fill(1)
+
+    # The band of a height is one more than the number of upper limits below it, the same as
+    # np.searchsorted but faster for the few bands of a palette. One past the last band means
+    # above every band.
+    for upper_limit in upper_limits:
+        bands += height_array > upper_limit
+    bands[bands > len(color_palette)] = 0
+    bands[~(height_array >= 0)] = 0
+
+    return bands
+
+
+def color_array(height_array, color_palette, out=None):
     """Takes an array with perlin noise and adds color based on the color and height
     value in the color palette
 
     Args:
         height_array (np.ndarray): Numpy array with perlin noise between 0-1
         color_palette (List): List with dictionary elements.
+        out (np.ndarray, optional): uint8 array of shape height_array.shape + (4,) to paint
+        into instead of allocating a new one. Defaults to None.
 
     Raises:
         ValueError: If the height_array is not an numpy array throw a ValueError exception.
+        ValueError: If out is not of shape height_array.shape + (4,)
 
     Returns:
         [ndarray]: numpy array containing RBG information.
@@ -33,23 +244,17 @@ def color_array(height_array, color_palette):
     if not isinstance(height_array, np.ndarray):
         raise TypeError('The provided array is not a numpy array.')
 
-    # Create an empty copy of array
-    array_colored = np.zeros(height_array.shape + (4,), dtype=np.uint8)
-    height_lower_limit = 0
+    if out is not None and out.shape != height_array.shape + (4,):
+        raise ValueError(f'out needs to be of shape {height_array.shape + (4,)}. Shape provided: {out.shape}')
 
-    width, height = height_array.shape
-    for color, height_upper_limit, _ in color_palette:
-        for x in range(width):
-            for y in range(height):
-                if height_array[x][y] <= height_upper_limit and height_array[x][y] > height_lower_limit:
-                    array_colored[x][y] = colors.get_rgb_color(color, 255)
+    # Look up the color of every band at once.
+    lookup_table = palette_lookup_table(color_palette)
+    bands = classify_heights(height_array, color_palette)
 
-        height_lower_limit = height_upper_limit
-    
-    return array_colored
+    return np.take(lookup_table, bands, axis=0, out=out)
 
 
-def create_color_palette(upp_dict):
+def create_color_palette(upp_dict, rng=None):
     """Takes a Universal Planetary Profile dictionary and determins which
     color, height level and land type has the corresponding color. The result is returned as a list
     of touples.
@@ -57,6 +262,7 @@ def create_color_palette(upp_dict):
 
     Args:
         upp_dict (dictionary): Has all the UPP information stored inside.
+        rng (PlanetRng, optional): Generator used to pick the land colors. Defaults to None.
 
     Raises:
         TypeError: If the provided type is not a dictionary raise an exception
@@ -69,6 +275,8 @@ def create_color_palette(upp_dict):
     # Ensure the upp_dict is a dictionary
     if not isinstance(upp_dict, dict):
         raise TypeError('The provided variable is not a dictionary.')
+
+    rng = ensure_rng(rng)
     
     # Palette is a list containing touples with color, height_level, legend name information.
     # Ex. ('dark_magenta', 0.4, 'canyon')
@@ -115,7 +323,7 @@ def create_color_palette(upp_dict):
     garden_lava = [['water', 'sand', 'land', 'mountain','volcano'],[None, 0.20, 0.45, 0.30, 0.05]]
 
     # garden worlds when freezing. Water is ice. no sand, land is snow. mountains are rock. Peaks are ice
-    ice_world = [['ice', 'snow'],[0.95, 0.05]]
+    ice_world = [['ice', 'snow'],[0.95, 1.00]]
     water_world = [['water'],[1.00]]
     water_lava_world = [['water', 'sand', 'mountain', 'volcano'],[0.95, 0.45, 0.50, 0.05]]
 
@@ -197,7 +405,7 @@ def create_color_palette(upp_dict):
     # 2. Calculate heights.
     # 2.a First remove the water level. Since the rest is calculated using percentage of the remaineder after
     # the lowest level.
-    palette.append( (random.choice(land_types.get(world[0][0])),
+    palette.append( (rng.choice(land_types.get(world[0][0])),
                     world[1].pop(0),
                     world[0].pop(0)))
 
@@ -207,7 +415,7 @@ def create_color_palette(upp_dict):
 
     for land, percent in zip(world[0],world[1]):
         height += (1-water_level)*percent
-        palette.append( (random.choice(land_types.get(land)),
+        palette.append( (rng.choice(land_types.get(land)),
                         height,
                         land))
 
@@ -219,7 +427,108 @@ def create_color_palette(upp_dict):
     return palette
 
 
-def upp_to_dict(upp_string):
+def decode_upp_strings(upp_strings):
+    """Decodes UPP strings into their values and checks them. These are the rules every UPP goes
+    through, one at a time or in a batch. A valid UPP is a starport letter (X or A-E), six
+    hexadecimal values inside UPP_LIMITS, a hyphen and a tech level of one or two digits, with
+    nothing before or after it.
+
+    Args:
+        upp_strings (list, np.ndarray): UPP strings. Example. ['A867949-13', 'X000000-0']
+
+    Raises:
+        TypeError: If upp_strings contains anything but strings, checked for every element of
+        lists and object arrays.
+
+    Returns:
+        tuple: The UPP strings as a 1D np.ndarray, an int16 array of shape (count, len(UPP_FIELDS))
+        with the values, an int16 array with the tech levels and an int8 array with the UPP_ERRORS
+        index of every string, -1 when the string is valid. The values of invalid strings are
+        meaningless.
+    """
+    # Lists are checked element by element, numpy would turn numbers in them into strings.
+    if not isinstance(upp_strings, np.ndarray):
+        upp_strings = np.asarray(upp_strings, dtype=object)
+    upp_strings = upp_strings.ravel()
+    if upp_strings.dtype == object:
+        not_strings = [upp_string for upp_string in upp_strings if not isinstance(upp_string, str)][:1]
+        if not_strings:
+            raise TypeError(f'An UPP string must be of type string. Type provided: {type(not_strings[0])}')
+        upp_strings = upp_strings.astype(str)
+    elif upp_strings.size == 0:
+        upp_strings = upp_strings.astype(str)
+    elif upp_strings.dtype.kind != 'U':
+        raise TypeError(f'An UPP string must be of type string. Array type provided: {upp_strings.dtype}')
+
+    count = len(upp_strings)
+    lengths = np.char.str_len(upp_strings)
+
+    # Get the ascii code of every character with one row per string, padded with zeros.
+    # Other characters become '?' and fail like any other character that does not belong.
+    encoded = np.char.encode(upp_strings, 'ascii', 'replace')
+    characters = np.zeros((count, max(encoded.dtype.itemsize, 10)), dtype=np.uint8)
+    characters[:, :encoded.dtype.itemsize] = encoded.view(np.uint8).reshape(count, encoded.dtype.itemsize)
+
+    # Decode the hexadecimal values. If spaceport quality = X set it to 0.
+    values = HEX_VALUES[characters[:, :len(UPP_FIELDS)]].astype(np.int16)
+    values[characters[:, 0] == ord('X'), 0] = 0
+
+    # Tech level is one or two decimal digits after the hyphen.
+    digits = characters[:, len(UPP_FIELDS) + 1:len(UPP_FIELDS) + 3].astype(np.int16) - ord('0')
+    is_digit = (digits >= 0) & (digits <= 9)
+    two_digits = lengths == 10
+    tech_level = np.where(two_digits, digits[:, 0]*10 + digits[:, 1], digits[:, 0])
+
+    # Starport quality is 0 (for X-none) or A-E. Every other value is bound by its limit.
+    out_of_bounds = values > np.array(UPP_LIMITS)
+    out_of_bounds[:, 0] |= (values[:, 0] > 0) & (values[:, 0] < 10)
+
+    # Set the error of every string. The first failing check of a string is the one reported.
+    failed = [  (lengths < 9) | (lengths > 10),
+                (characters[:, len(UPP_FIELDS)] != ord('-')) | ~is_digit[:, 0] | (two_digits & ~is_digit[:, 1]),
+                np.any(values < 0, axis=1),
+                np.any(out_of_bounds, axis=1)]
+    errors = np.select(failed, [0, 1, 2, 3 + np.argmax(out_of_bounds, axis=1)], -1).astype(np.int8)
+
+    return upp_strings, values, tech_level, errors
+
+
+def decode_upp(upp_string):
+    """Decodes a single UPP string with the rules of decode_upp_strings.
+
+    Args:
+        upp_string (string): UPP string containing hexadecimal values. Example. 'A867949-13'
+
+    Raises:
+        TypeError: If the provided upp_string is not of type string.
+        ValueError: If the upp_string is not a valid UPP. The message tells why.
+
+    Returns:
+        tuple: A tuple of ints with the values in UPP_FIELDS order and the tech level as an int.
+    """
+    if not isinstance(upp_string, str):
+        raise TypeError('An UPP string must be of type string.')
+
+    _, values, tech_level, errors = decode_upp_strings([upp_string])
+    if errors[0] >= 0:
+        raise ValueError(f'{UPP_ERRORS[errors[0]]} \n UPP provided: {upp_string}')
+
+    return tuple(int(value) for value in values[0]), int(tech_level[0])
+
+
+def temperature_classes(temperature_scores):
+    """Turns temperature rolls into temperature classes using TEMPERATURE_LIMITS.
+
+    Args:
+        temperature_scores (int, np.ndarray): 2d6 rolls plus the atmosphere modifier.
+
+    Returns:
+        np.ndarray: The temperature class of every roll. A 0D array for a single roll.
+    """
+    return np.array(TEMPERATURE_CLASSES)[np.searchsorted(TEMPERATURE_LIMITS, temperature_scores)]
+
+
+def upp_to_dict(upp_string, rng=None):
     """Takes an Universal Planetary Profile string (UPP string) and converts
     it into a dictionary. The values are taken from the UPP and the keys are the following: 
     UPP (Universal Planetary Profile)
@@ -230,141 +539,170 @@ def upp_to_dict(upp_string):
     Population 0-C
     Goverment type 0-F
     Law level 0-F
-    Tech level 0-F
+    Tech level 0-99
     Temperature frozen, cold, temperate, hot, boiling
     Observe that temperature is no included in the upp-string but calculated randomly 
     in conjuntion with atmosphere
-    Example. Earth = A867949-D
+    Example. Earth = A867949-13
 
     Args:
         upp_string (string): UPP string containing hexadecimal values
+        rng (PlanetRng, optional): Generator used to roll the temperature. Defaults to None.
 
     Raises:
         TypeError: If the provided upp_string is not of type string.
-        ValueError: If any individual UPP value is outside of bounds.
+        ValueError: If the upp_string is not a valid UPP. See decode_upp_strings.
 
     Returns:
         dictionary: A dictionary that has paired the different names with the values in the docstring. See
         description
     """
-
-    if not isinstance(upp_string, str):
-        raise TypeError('An UPP string must be of type string.')
-    
-    # Save the upp_string to be added as upp in the dictionary.
-    upp_serial = upp_string
-
-    # Since Tech level is not hexadecimal. Split the array and handle tech level separately.
-    upp_string, tech_level = upp_string.split('-')
-
-    # Create a ditionary with name and int value pairs.
-    upp_variables = [   'starport_quality',
-                        'size',
-                        'atmosphere_type',
-                        'hydrographic_percentage',
-                        'population',
-                        'government_type',
-                        'law_level']
-    
-    # If spaceport quality = X (Set it to 0)
-    upp_string = upp_string.replace('X', '0')
+    values, tech_level = decode_upp(upp_string)
+    rng = ensure_rng(rng)
 
     # Initalize the upp_dict with upp_serial as its first key
-    upp_dict = {'upp_serial' : upp_serial}
-
-    for variable_name, upp_value in zip(upp_variables, upp_string):
-        upp_dict.update({variable_name : int(upp_value, 16)})
-
-    # Check if any UPP value is outside of bounds.
-
-    # Starport quality [0 (for X-none) or A-E]
-    if (upp_dict['starport_quality'] > 0 and upp_dict['starport_quality'] < 10) or upp_dict['starport_quality'] > 14:
-        starport_value = upp_dict['starport_quality']
-        raise ValueError(f'Starport quality must be of values 0(sybol for X) or between A-E \n Starport value provided: {starport_value}')
-
-    # Size [0-A]
-    if upp_dict['size'] < 0 or upp_dict['size'] > 10:
-        size_value = upp_dict['size']
-        raise ValueError(f'Planet size needs to be between 0-A in size. \n Size value provided: {size_value}')
-
-    # Atmosphere type [0-F]
-    if upp_dict['atmosphere_type'] < 0 or upp_dict['atmosphere_type'] > 15:
-        atmo_value = upp_dict['atmosphere_type']
-        raise ValueError(f'Atmosphere types can only range between 0-F \n Atmosphere value entered: {atmo_value}')
-
-    # Hydrographic percentage [0-A]
-    if upp_dict['hydrographic_percentage'] < 0 or upp_dict['hydrographic_percentage'] > 10:
-        hydro_value = upp_dict['hydrographic_percentage']
-        raise ValueError(f'Hydrographic percentage must range beetween 0-A. \n Hydrographic value provided: {hydro_value}')
-
-    # Population [0-C]
-    if upp_dict['population'] < 0 or upp_dict['population'] > 12:
-        pop_value = upp_dict['population']
-        raise ValueError(f'Population must range beetween 0-C. \n Population value provided: {pop_value}')
-
-    # Goverment type [0-F]
-    if upp_dict['government_type'] < 0 or upp_dict['government_type'] > 15:
-        gov_value = upp_dict['government_type']
-        raise ValueError(f'Goverment type must range beetween 0-A. \n Goverment type value provided: {gov_value}')
-
-    # Law level [0-F]
-    if upp_dict['law_level'] < 0 or upp_dict['law_level'] > 15:
-        law_value = upp_dict['law_level']
-        raise ValueError(f'Law level must range beetween 0-A. \n Law level value provided: {law_value}')
-
-    # Handle tech level seperately
-    upp_dict.update({'tech_level': int(tech_level)})
+    upp_dict = {'upp_serial' : upp_string}
+    upp_dict.update(zip(UPP_FIELDS, values))
+    upp_dict.update({'tech_level': tech_level})
     
     # Moongose traveler 2e Core rulebook P.219 generate temperature by rolling two six sided die
-    # and adding a modifier provided by planetary atmosphere (corresponding tothe dictionary below) 
-    
-    temperature_modifier = {0: 0,
-                            1: 0,
-                            2: -2,
-                            3: -2,
-                            4: -1,
-                            5: -1,
-                            6: 0,
-                            7: 0,
-                            8: 1,
-                            9: 1,
-                            10: 2,
-                            11: 6,
-                            12: 6,
-                            13: 2,
-                            14: -1,
-                            15: 2}
-
-    dice = random.randint(1,6)
-    dice += random.randint(1,6)
-    temperature_score = dice + temperature_modifier.get(upp_dict.get('atmosphere_type'))
-    
-    if temperature_score <=2:
-        upp_dict.update({'temperature':'frozen'})
-    elif temperature_score <=4:
-        upp_dict.update({'temperature':'cold'})
-    elif temperature_score <=9:
-        upp_dict.update({'temperature':'temperate'})
-    elif temperature_score <=11:
-        upp_dict.update({'temperature':'hot'})
-    elif temperature_score >=12:
-        upp_dict.update({'temperature':'boiling'})
+    # and adding a modifier provided by planetary atmosphere (see atmosphere_table)
+
+    dice = rng.randint(1,6)
+    dice += rng.randint(1,6)
+    temperature_score = dice + int(atmosphere_temperature_modifier[upp_dict.get('atmosphere_type')])
+    upp_dict.update({'temperature': str(temperature_classes(temperature_score))})
 
     return upp_dict
 
 
-def to_planet_shape(world_array, upp_dict):
+def parse_upp_batch(upp_strings, rng=None):
+    """Parses many UPP strings at once into a structured array with one row per world. Works
+    like upp_to_dict with the same rules, but all strings are decoded together and every
+    invalid string is reported by index instead of raising on the first one.
+
+    Args:
+        upp_strings (list, np.ndarray): UPP strings. Example. ['A867949-13', 'X000000-0']
+        rng (PlanetRng, optional): Generator used to roll the temperatures. Defaults to None.
+
+    Raises:
+        TypeError: If upp_strings contains anything but strings.
+
+    Returns:
+        tuple: A structured np.ndarray with the fields upp_serial, the UPP_FIELDS, tech_level and
+        temperature, and an np.ndarray with the indices of the invalid rows. Invalid rows keep
+        their upp_serial and are zero everywhere else with an empty temperature.
+    """
+    upp_strings, values, tech_level, errors = decode_upp_strings(upp_strings)
+    valid = errors < 0
+
+    rng = ensure_rng(rng)
+    count = len(upp_strings)
+
+    # Roll 2d6 plus the atmosphere modifier for the temperature of every world.
+    dice = rng.generator.integers(1, 6, size=(count, 2), endpoint=True).sum(axis=1)
+    atmosphere = np.where(valid, values[:, 2], 0)
+    temperature = temperature_classes(dice + atmosphere_temperature_modifier[atmosphere])
+
+    # Collect the columns of the valid worlds.
+    worlds = np.zeros(count, dtype=[('upp_serial', upp_strings.dtype)]
+                                    + [(field, np.uint8) for field in UPP_FIELDS]
+                                    + [('tech_level', np.uint8), ('temperature', 'U9')])
+    worlds['upp_serial'] = upp_strings
+    for column, field in enumerate(UPP_FIELDS):
+        worlds[field][valid] = values[valid, column]
+    worlds['tech_level'][valid] = tech_level[valid]
+    worlds['temperature'][valid] = temperature[valid]
+
+    return worlds, np.flatnonzero(~valid)
+
+def planet_radius(width, height, size):
+    """Calculates the radius of the planet in pixels. The planet takes 8-88% of the smallest
+    axis depending on size, leaving 12% for atmosphere.
+
+    Args:
+        width (int): Width of the planet image.
+        height (int): Height of the planet image.
+        size (int): Size from the universal planetary profile. 0-A.
+
+    Returns:
+        float: The radius in pixels.
+    """
+    smallest_axis = min(width, height)
+    return (smallest_axis/2) * (0.08*(1+size))
+
+
+@lru_cache(maxsize=8)
+def radial_offsets(width, height):
+    """Calculates the squared distance from the centre of the image to every row and every
+    column. Only these two small vectors are cached per image size, never the full field.
+    The returned arrays are read only since they are shared.
+
+    Args:
+        width (int): Width of the planet image.
+        height (int): Height of the planet image.
+
+    Returns:
+        tuple: float32 arrays of shape (width, 1) and (1, height) with the squared distances.
+    """
+    x = np.arange(width, dtype=np.float32).reshape(width, 1) - np.float32(width/2)
+    y = np.arange(height, dtype=np.float32).reshape(1, height) - np.float32(height/2)
+    x *= x
+    y *= y
+    x.flags.writeable = False
+    y.flags.writeable = False
+
+    return x, y
+
+
+def radial_distance(width, height):
+    """Calculates the distance from the centre of the image to every pixel by broadcasting the
+    cached row and column offsets.
+
+    Args:
+        width (int): Width of the planet image.
+        height (int): Height of the planet image.
+
+    Returns:
+        np.ndarray: float32 array of shape (width, height) with the distances in pixels.
+    """
+    x, y = radial_offsets(width, height)
+    distance = x + y
+    np.sqrt(distance, out=distance)
+
+    return distance
+
+
+def planet_mask(width, height, size):
+    """Creates a boolean mask that is True for every pixel inside the planet disc. The disc is
+    centered the same way as in to_planet_shape.
+
+    Args:
+        width (int): Width of the planet image.
+        height (int): Height of the planet image.
+        size (int): Size from the universal planetary profile. 0-A.
+
+    Returns:
+        np.ndarray: Boolean array of shape (width, height).
+    """
+    return radial_distance(width, height) <= planet_radius(width, height, size)
+
+
+def to_planet_shape(world_array, upp_dict, out=None):
     """Takes a colored world array and cuts out everything outside of the desired radius. Creating a round
     planetoid shape. The radius is derived from the Universal Planetary Profile
 
     Args:
-        world_array (np.ndarray): A numpy array with RGB color lists.
+        world_array (np.ndarray): A numpy array with RGB color lists or a 2D array of palette indices.
         upp_dict (dict): Dictionary containing the planet Universal Planetary Profile
+        out (np.ndarray, optional): Array of the same shape to write the planet into. May be
+        world_array itself to cut out the planet in place. Defaults to None.
 
     Raises:
         TypeError: If the array is not an numpy array the alrogitm fails.
         TypeError: If the the universal planetary profile is not converted to a dictionary
         size can not be gathered.
+        ValueError: out needs to be of the same shape as world_array.
 
     Returns:
         np.nddarray: The masked array creating the planetoid shape.
@@ -375,152 +713,234 @@ def to_planet_shape(world_array, upp_dict):
     if not isinstance(upp_dict, dict):
         raise TypeError('upp_dict needs to be cleaned from string to dictionary format')
     # Get width and height of the world array.
-    width, height, _ = world_array.shape
-    # calculate the radius of the planet to 8-88% of the smallest axis leaving 12% for atmosphere
-    if width <= height:
-        smallest_axis = width
+    width, height = world_array.shape[:2]
+
+    # True for every pixel inside the planet.
+    mask = planet_mask(width, height, upp_dict.get('size'))
+
+    # Palette index 0 is transparent in indexed planets.
+    if world_array.ndim == 2:
+        black = 0
     else:
-        smallest_axis = height
+        black = np.array(colors.get_rgb_color('black', 0), dtype=world_array.dtype)
+        mask = mask[..., np.newaxis]
 
-    r = (smallest_axis/2) * (0.08*(1+upp_dict.get('size')))
-    y,x = np.ogrid[-height/2:height/2, -width/2:width/2]
+    if out is None:
+        return np.where(mask, world_array, black).astype(world_array.dtype, copy=False)
+    elif out.shape != world_array.shape:
+        raise ValueError(f'out needs to be of shape {world_array.shape}. Shape provided: {out.shape}')
 
-    # creates a mask with True False values
-    # at indices
-    mask = x**2+y**2 <= r**2
+    # Only the pixels outside the planet change when cutting out in place.
+    if not out is world_array:
+        np.copyto(out, world_array)
+    np.copyto(out, black, where=~mask)
 
-    black = colors.get_rgb_color('black', 0)
-    planet_world = np.zeros_like(world_array)
+    return out
 
-    for i in range(width):
-        for j in range(height):
-            if mask[i][j]:
-                planet_world[i][j] = world_array[i][j]
-            else:
-                planet_world[i][j] = black
-    
+
+def alpha_composite(destination, source):
+    """Places source colors over destination colors with the porter-duff "over" operator.
+
+    Args:
+        destination (np.ndarray): uint8 RGBA rows of shape (n, 4) underneath.
+        source (np.ndarray): uint8 RGBA rows of shape (n, 4) on top.
+
+    Returns:
+        np.ndarray: uint8 RGBA rows of shape (n, 4). Where both are fully transparent the source
+        color is kept.
+    """
+    source_alpha = source[:, 3:].astype(np.float32) / 255
+    destination_alpha = destination[:, 3:].astype(np.float32) / 255 * (1 - source_alpha)
+    alpha = source_alpha + destination_alpha
+
+    # Weigh the colors by how much each one covers.
+    color = source[:, :3] * source_alpha + destination[:, :3] * destination_alpha
+    visible = alpha[:, 0] > 0
+    color[visible] /= alpha[visible]
+    color[~visible] = source[~visible, :3]
+
+    result = np.empty_like(source)
+    result[:, :3] = np.round(color)
+    result[:, 3] = np.round(alpha[:, 0] * 255)
+
+    return result
+
+
+def composite_color(planet_world, mask, color, alpha):
+    """Composites one color with a separate alpha for every pixel over the masked pixels of a planet.
+    Used for atmosphere layers and anything else drawn on top of the planet.
+
+    Args:
+        planet_world (np.ndarray, IndexedImage): An RGBA planet array or an indexed planet.
+        mask (np.ndarray): Boolean array of shape (width, height) with the pixels to paint.
+        color (string): Name of the color to paint.
+        alpha (np.ndarray): 0-255 alpha of every masked pixel.
+
+    Returns:
+        np.ndarray, IndexedImage: The same planet with the color composited on top.
+    """
+    if not isinstance(planet_world, IndexedImage):
+        layer = colors.get_rgb_array(color, alpha)
+        planet_world[mask] = alpha_composite(planet_world[mask], layer)
+        return planet_world
+
+    # Indexed planets round the alpha to ATMOSPHERE_LEVELS steps. Each step over every palette
+    # color underneath gets one palette entry.
+    levels = np.round(np.asarray(alpha) * (ATMOSPHERE_LEVELS-1) / 255).astype(int)
+    level_alpha = np.round(np.arange(ATMOSPHERE_LEVELS) * 255 / (ATMOSPHERE_LEVELS-1)).astype(np.uint8)
+
+    # Pixels that round to no alpha keep their color and need no palette entries. Without any
+    # visible pixel, e.g. an atmosphere of density 0, the palette is left untouched.
+    levels = np.broadcast_to(levels, (np.count_nonzero(mask),))
+    visible = levels > 0
+    if not visible.any():
+        return planet_world
+    mask = mask.copy()
+    mask[mask] = visible
+    levels = levels[visible]
+
+    underneath = planet_world.indices[mask]
+    pairs, pixel_pairs = np.unique(underneath.astype(int) * ATMOSPHERE_LEVELS + levels, return_inverse=True)
+    pair_indices, pair_levels = np.divmod(pairs, ATMOSPHERE_LEVELS)
+
+    layer = colors.get_rgb_array(color, level_alpha[pair_levels])
+    pair_colors = alpha_composite(planet_world.lookup_table()[pair_indices], layer)
+
+    planet_world.indices[mask] = planet_world.add_colors(pair_colors)[pixel_pairs.ravel()]
     return planet_world
 
 
 def add_atmosphere(planet_world, upp_dict):
     """Paints an atmosphere around the planetary array depecting what type and density of the
-    planetary atmosphere
+    planetary atmosphere. The atmosphere is alpha composited over what is already there.
 
     Args:
-        planet_world (np.ndarray): A colored RGB array converted to a planetary shape
+        planet_world (np.ndarray, IndexedImage): A colored RGB array converted to a planetary shape.
+        In an indexed planet the atmosphere is painted with ATMOSPHERE_LEVELS alpha levels.
         upp_dict (dict): Dictionary containing the planets universal planetary profile
 
     Raises:
         TypeError: If the array is not an numpy array the alrogitm fails.
         TypeError: If the the universal planetary profile is not converted to a dictionary
         size can not be gathered.
+        ValueError: If the atmosphere type is not in atmosphere_table.
 
     Returns:
         np.ndarray: Numpy array containing the colored planet with an added atmoshperic layer.
     """
 
-    if not isinstance(planet_world, np.ndarray):
+    if not isinstance(planet_world, (np.ndarray, IndexedImage)):
         raise TypeError('The planetary array needs to be an numpy array')
 
     if not isinstance(upp_dict, dict):
         raise TypeError('The Universal planetary profile needs to be converted to a dictionary')
-    # Fetch the atmosphere color
-    density = 255
-    fall_off = 1
-
-    if upp_dict.get('atmosphere_type') == 0:
-        # No atmosphere
-        color = 'black'
-        density *= 0
-    elif upp_dict.get('atmosphere_type') == 1:
-        # Trace
-        color = 'sky_blue'
-        density *= 0.25
-    elif upp_dict.get('atmosphere_type') == 2:
-        # Very thin and tainted
-        color = 'chocolate'
-        density *= 0.5
-    elif upp_dict.get('atmosphere_type') == 3:
-        # Very thin
-        color = 'sky_blue'
-        density *= 0.5
-    elif upp_dict.get('atmosphere_type') == 4:
-        # Thin and tainted
-        color = 'chocolate'
-        density *= 0.75
-    elif upp_dict.get('atmosphere_type') == 5:
-        # Thin
-        color = 'sky_blue'
-        density *= 0.75
-    elif upp_dict.get('atmosphere_type') == 6:
-        # Standard
-        color = 'sky_blue'
-    elif upp_dict.get('atmosphere_type') == 7:
-        # Standard tainted
-        color = 'chocolate'
-    elif upp_dict.get('atmosphere_type') == 8:
-        # Dense
-        color = 'sky_blue'
-        fall_off = 1.5
-    elif upp_dict.get('atmosphere_type') == 9:
-        # Dense tainted
-        color = 'chocolate'
-        fall_off = 1.5
-    elif upp_dict.get('atmosphere_type') == 10:
-        # Exotic
-        color = 'dark_violet'
-    elif upp_dict.get('atmosphere_type') == 11:
-        # Corrosive
-        color = 'lawn_green'
-    elif upp_dict.get('atmosphere_type') == 12:
-        # Insidious
-        color = 'yellow'
-    elif upp_dict.get('atmosphere_type') == 13:
-        # Very dense
-        color = 'sky_blue'
-        fall_off = 2
-    elif upp_dict.get('atmosphere_type') == 14:
-        # low
-        color = 'sky_blue'
-        density *= 0.6
-    elif upp_dict.get('atmosphere_type') == 15:
-        # Unusual
-        color = 'pale_green'
 
+    # Fetch the atmosphere color
+    atmosphere_type = upp_dict.get('atmosphere_type')
+    if not atmosphere_type in atmosphere_table:
+        raise ValueError(f'Atmosphere type needs to be between 0-F. Atmosphere type provided: {atmosphere_type}')
+    atmosphere = atmosphere_table[atmosphere_type]
+    color, fall_off = atmosphere['color'], atmosphere['fall_off']
+    density = atmosphere['density'] * 255
 
     # Get width and height of the world array.
-    width, height, _ = planet_world.shape
-
-    # calculate the radius of the planet to 8-88% of the smallest axis leaving 12% for atmosphere
-    if width <= height:
-        smallest_axis = width
+    if isinstance(planet_world, IndexedImage):
+        width, height = planet_world.indices.shape
     else:
-        smallest_axis = height
+        width, height = planet_world.shape[:2]
 
-    r = (smallest_axis/2) * (0.08*(1+upp_dict.get('size')))
+    # calculate the radius of the planet to 8-88% of the smallest axis leaving 12% for atmosphere
+    r = planet_radius(width, height, upp_dict.get('size'))
     # The size of the atmosphere should scale with planet radius. 12% of smallest_axis/2 = 0,136 * r
     #atmosphere_range = (smallest_axis/2) * 0.12
     atmosphere_range = 0.136 * r
-    centre_x, centre_y = width/2, height/2
-    # add colors here
-    for x in range(width):
-        for y in range(height):
-            delta_x = x-centre_x
-            delta_y = y-centre_y
-            dist = sqrt(delta_x**2+delta_y**2)
-
-            if dist-r >= 0 and dist-r < atmosphere_range:
-                alpha = int(density*(1-((dist-r)/atmosphere_range)/fall_off))
-                planet_world[x][y] = colors.get_rgb_color(color, alpha)
-    
-    return planet_world
+
+    # Get the distance above the planet surface of every pixel in the atmosphere.
+    altitude = radial_distance(width, height)
+    altitude -= np.float32(r)
+    annulus = (altitude >= 0) & (altitude < atmosphere_range)
+    altitude = altitude[annulus]
+
+    # The atmosphere fades out linearly with altitude.
+    alpha = (density*(1-(altitude/atmosphere_range)/fall_off)).astype(int)
+
+    return composite_color(planet_world, annulus, color, alpha)
+
+@lru_cache(maxsize=16)
+def station_sprite(station_width, station_height, letter):
+    """Draws the space station at the given size with the starport letter below it.
+    Sprites are cached per size and letter so a batch of planets only draws each
+    station once.
+
+    Args:
+        station_width (int): Width of the station in pixels.
+        station_height (int): Height of the station in pixels, not counting the letter.
+        letter (str): Starport letter to stamp the station with.
+
+    Returns:
+        np.ndarray: Read-only RGBA array of shape (station_height + letter height, station_width, 4).
+    """
+    # read in space station stock file.
+    station_image = Image.open('Images/space-station.png')
+    station_image = station_image.resize((station_width, station_height))
+
+    # add a letter to the station.
+    letter_color = colors.get_rgb_color('red')
+
+    # Font size in pixels
+    font_size = int(station_height/2)
+    font = get_font("Fonts/Optima-LT-Medium-Italic.ttf", font_size)
+
+    # Get width and heigth of the letter.
+    x1, y1, x2, y2 = font.getbbox(letter)
+    x = x2 - x1
+    y = y2 - y1
+
+    # expand station image text height
+    exp_image = Image.new('RGBA', (station_width, station_height + y))
+    exp_image.paste(station_image, (0, 0))
+
+    # draw the letter below the station.
+    draw_on_station = ImageDraw.Draw(exp_image)
+
+    x = int((station_width-x)/2)-1
+    y = int(station_height-7)
+
+    draw_on_station.text((x, y), letter, tuple(letter_color), font=font)
+
+    # convert the image to a read-only np_array.
+    sprite = np.array(exp_image)
+    sprite.flags.writeable = False
+    return sprite
+
+@lru_cache(maxsize=16)
+def indexed_station_sprite(station_width, station_height, letter):
+    """Reduces the station sprite to at most STATION_COLORS colors for indexed planets.
+
+    Args:
+        station_width (int): Width of the station in pixels.
+        station_height (int): Height of the station in pixels, not counting the letter.
+        letter (str): Starport letter to stamp the station with.
+
+    Returns:
+        tuple: Read-only RGBA palette of shape (n, 4) and read-only palette indices in the
+        shape of station_sprite.
+    """
+    station_image = Image.fromarray(station_sprite(station_width, station_height, letter))
+    station_colors = station_image.quantize(colors=STATION_COLORS, method=Image.Quantize.FASTOCTREE)
+    station_palette = np.array(station_colors.getpalette('RGBA'), dtype=np.uint8).reshape(-1, 4)
+    sprite_indices = np.array(station_colors)
+    station_palette.flags.writeable = False
+    sprite_indices.flags.writeable = False
+    return station_palette, sprite_indices
 
 def add_station(planet_world, upp_dict):
     """Appends a station with appropriate quality to the upper left of a planet.
     Distance from the planet is adjusted with planetary size.
 
     Args:
-        planet_world (np.ndarray): Needs to be a numpy array.
+        planet_world (np.ndarray, IndexedImage): Needs to be a numpy array or an indexed planet. The
+        station of an indexed planet is reduced to at most STATION_COLORS palette colors.
         upp_dict (dict): Dictionary contaning UPP-data.
 
     Raises:
@@ -532,62 +952,36 @@ def add_station(planet_world, upp_dict):
     """
     # if station quality is not none or 0.
     if not upp_dict['starport_quality'] == 0 and not upp_dict['starport_quality'] == None:
-        # read in space station stock file.
-        station_image = Image.open('Images/space-station.png')
-
         # If no planet world is provided. Raise an exception
-        if not isinstance(planet_world, np.ndarray):
+        if isinstance(planet_world, IndexedImage):
+            pixels = planet_world.indices
+            planet_width, planet_height = pixels.shape
+        elif not isinstance(planet_world, np.ndarray):
             raise TypeError('The planet_array must be an numpy array of shape (x, y, 4')
         elif planet_world[0][0].size != 4:
             raise TypeError('''The planet_array provided is of wrong shape.
                                 Needs to be of shape: (x, y, 4)''')
         else:
+            pixels = planet_world
             planet_width, planet_height, _ = planet_world.shape
 
         # Resize to 10% of the width and height values of planet_world.
         station_width = int(0.1 * planet_width)
         station_height = int(0.1 * planet_height)
-        station_image = station_image.resize((station_width, station_height))
-
-        # add a letter to the station.
-        letter_color = colors.get_rgb_color('red')
-
-        # Font size in pixels
-        font_size = int(station_height/2)
-        font = ImageFont.truetype("Fonts/Optima-LT-Medium-Italic.ttf", font_size)
 
         # Decice what letter to stamp the station with.
-        letter = ""
-        if upp_dict['starport_quality'] == 10:
-            letter = "A"
-        elif upp_dict['starport_quality'] == 11:
-            letter = "B"
-        elif upp_dict['starport_quality'] == 12:
-            letter = "C"
-        elif upp_dict['starport_quality'] == 13:
-            letter = "D"
-        elif upp_dict['starport_quality'] == 14:
-            letter = "E"
-
-        # Get width and heigth of the letter.
-        x1, y1, x2, y2 = font.getbbox(letter)
-        x = x2 - x1
-        y = y2 - y1
-
-        # expand station image text height
-        exp_image = Image.new('RGBA', (station_width, station_height + y))
-        exp_image.paste(station_image, (0, 0))
-
-        # draw the letter below the station.
-        draw_on_station = ImageDraw.Draw(exp_image)
-
-        x = int((station_width-x)/2)-1
-        y = int(station_height-7)
-        
-        draw_on_station.text((x, y), letter, tuple(letter_color), font=font)
-
-        # convert the image to a np_array.
-        im_as_array = np.asarray(exp_image)
+        letter = starport_letters.get(upp_dict['starport_quality'], "")
+
+        # Get the finished station and the pixels it covers.
+        sprite = station_sprite(station_width, station_height, letter)
+        opaque = sprite[..., 3] > 0
+        if isinstance(planet_world, IndexedImage):
+            # Point the reduced station colors into the planet palette.
+            station_palette, sprite_indices = indexed_station_sprite(station_width, station_height, letter)
+            station_indices = planet_world.add_colors(station_palette)
+            sprite = station_indices[sprite_indices]
+        else:
+            opaque = opaque[..., np.newaxis]
 
         # calculate the radius of the planet to 8-88% of the smallest axis leaving 12% for atmosphere
         if planet_width <= planet_height:
@@ -603,20 +997,23 @@ def add_station(planet_world, upp_dict):
         start_point_x = int(sqrt(2)*(smallest_axis*(10 - upp_dict.get('size')))/50)
         start_point_y = start_point_x
 
-        # replace the values of the array in the top left corner
-        im_width, im_height, _ = im_as_array.shape
-        for x in range(im_width):
-            for y in range(im_height):
-                planet_world[start_point_x + x][start_point_y + y] = im_as_array[x][y]
+        # Copy the visible station pixels into the top left corner.
+        im_width, im_height = sprite.shape[:2]
+        region = pixels[start_point_x:start_point_x + im_width, start_point_y:start_point_y + im_height]
+        np.copyto(region, sprite, where=opaque)
 
     return planet_world
 
-def world_image_creation(world_array, upp_serial=None):
+def world_image_creation(world_array, upp_serial=None, rng=None, workspace=None, indexed=False):
     """Takes a 2d perlin noise array cleaned to values ranging 0-1
 
     Args:
         world_array (np.ndarray): numpy array containing the perlin noise data.
         upp_serial (string, optional): The universal planetar profile string.. Defaults to None.
+        rng (PlanetRng, optional): Generator for the temperature and color rolls. Defaults to None.
+        workspace (PlanetWorkspace, optional): Paint the planet into the workspace image instead
+        of a new array. Defaults to None.
+        indexed (bool, optional): Return an IndexedImage instead of an RGBA array. Defaults to False.
 
     Raises:
         TypeError: The perlin noise array needs to be an numpy array to work properly.
@@ -638,20 +1035,69 @@ def world_image_creation(world_array, upp_serial=None):
             raise TypeError('''Planetary profile needs to be a string of hexadecimal numbers ending on a
             hyphen followed by a double digit decimal number. Ex. A867949-12''')
 
+    rng = ensure_rng(rng)
 
     # Clean the data and sort into a dictionary 
+    upp_dict = upp_to_dict(upp_serial, rng)
+
+    return render_planet(world_array, upp_dict, rng, workspace, indexed=indexed)
+
+
+def render_planet(world_array, upp_dict, rng=None, workspace=None, color_palette=None, indexed=False):
+    """Paints a planet from a noise array and an already parsed universal planetary profile.
+    Colors the terrain, cuts out the planet shape and adds the atmosphere and station.
+
+    Args:
+        world_array (np.ndarray): numpy array containing the noise data between 0-1.
+        upp_dict (dict): Dictionary containing the planet Universal Planetary Profile.
+        rng (PlanetRng, optional): Generator for the color rolls. Defaults to None.
+        workspace (PlanetWorkspace, optional): Paint the planet into the workspace image instead
+        of a new array. Defaults to None.
+        color_palette (list, optional): Palette from create_color_palette. Rolled from rng if not
+        provided. Defaults to None.
+        indexed (bool, optional): Carry one uint8 palette index per pixel through the whole
+        pipeline instead of RGBA values and return an IndexedImage. Defaults to False.
+
+    Raises:
+        ValueError: world_array needs heights between 0-1 inside the planet.
+
+    Returns:
+        np.ndarray: The planet as an RGBA array, or an IndexedImage if indexed.
+    """
+    rng = ensure_rng(rng)
+
     global universal_planet_profile
-    universal_planet_profile = upp_to_dict(upp_serial)
+    universal_planet_profile = upp_dict
 
     # Depending on geology use different sets of colors
     global geology_palette
-    geology_palette = create_color_palette(universal_planet_profile)
+    if color_palette is None:
+        color_palette = create_color_palette(universal_planet_profile, rng)
+    geology_palette = color_palette
 
     # Paint a colored image
-    colored_world = color_array(world_array, geology_palette)
+    image_buffer = None
+    if indexed:
+        if not workspace == None:
+            image_buffer = workspace.bands
+        bands = classify_heights(world_array, geology_palette, out=image_buffer)
+        planet_world = IndexedImage(bands, palette_lookup_table(geology_palette))
+        colored_world = planet_world.indices
+    else:
+        if not workspace == None:
+            image_buffer = workspace.image
+        colored_world = color_array(world_array, geology_palette, out=image_buffer)
+        planet_world = colored_world
+
+    # Depending on planet size change the radius. The colored world is not used again so
+    # the planet is cut out in place.
+    to_planet_shape(colored_world, universal_planet_profile, out=colored_world)
 
-    # Depending on planet size change the radius
-    planet_world = to_planet_shape(colored_world, universal_planet_profile)
+    # Every pixel inside the planet needs a color. A hole means a height outside every band.
+    disc = planet_mask(*colored_world.shape[:2], universal_planet_profile.get('size'))
+    opacity = colored_world if indexed else colored_world[..., 3]
+    if not np.all(opacity[disc]):
+        raise ValueError('world_array has heights outside the color palette inside the planet. Heights need to be between 0-1.')
 
     # Depending on atmosphear add an outer radious representing type and density
     planet_world_with_atmosphere = add_atmosphere(planet_world, universal_planet_profile)
@@ -667,42 +1113,130 @@ def world_image_creation(world_array, upp_serial=None):
     return planet_world_with_station 
 
 
+def generate_planet(upp_serial, width, height, detail=1, octaves=1, rng=None, workspace=None,
+                    spherical=False, noise_backend='perlin', indexed=False):
+    """Generates the noise for a planet and paints it. In spherical mode only the pixels of the
+    planet disc are sampled, projected onto a sphere, so the noise work scales with the size of
+    the planet instead of the whole image. Flat planets are stretched over the whole noise field
+    like world_image_creation, so they calculate every pixel.
+
+    Args:
+        upp_serial (string): The universal planetary profile string.
+        width (int): Width of the planet image.
+        height (int): Height of the planet image.
+        detail (int, optional): Higher means higher frequency. Defaults to 1.
+        octaves (int, optional): Gives a fractal look. Defaults to 1.
+        rng (PlanetRng, optional): Generator for every random roll of the planet. Defaults to None.
+        workspace (PlanetWorkspace, optional): Arrays to generate the noise and paint the planet
+        into. Needs to be of size (width, height). Defaults to None.
+        spherical (bool, optional): Sample 3D noise on a sphere instead of a flat noise field.
+        Defaults to False.
+        noise_backend (str, optional): Noise backend for flat planets. Spherical planets use
+        perlin noise. Defaults to 'perlin'.
+        indexed (bool, optional): Return an IndexedImage instead of an RGBA array. Defaults to False.
+
+    Raises:
+        ValueError: workspace needs to be of size (width, height).
+        ValueError: Spherical planets can only use the perlin noise backend.
+
+    Returns:
+        np.ndarray: The planet as an RGBA array.
+    """
+    if not workspace == None and (workspace.width, workspace.height) != (width, height):
+        raise ValueError(f'workspace needs to be of size {(width, height)}. Size provided: {(workspace.width, workspace.height)}')
+
+    if spherical and noise_backend != 'perlin':
+        raise ValueError(f'Spherical planets can only use the perlin noise backend. Provided: {noise_backend}')
+
+    rng = ensure_rng(rng)
+    upp_dict = upp_to_dict(upp_serial, rng)
+
+    noise_buffer = None
+    if not workspace == None:
+        noise_buffer = workspace.noise
+
+    if spherical:
+        radius = planet_radius(width, height, upp_dict['size'])
+        world_array = perlin.perlin_sphere(width, height, radius, detail, octaves, rng, out=noise_buffer)
+    else:
+        world_array = perlin.perlin2d(width, height, detail, octaves, rng, out=noise_buffer,
+                                        noise_backend=noise_backend)
+
+    return render_planet(world_array, upp_dict, rng, workspace, indexed=indexed)
+
+
+def generate_planet_progressive(upp_serial, width, height, detail=1, octaves=1, rng=None,
+                                spherical=False, noise_backend='perlin', preview_scale=4, refine=True,
+                                indexed=False):
+    """Generator version of generate_planet. Yields small previews of the planet first and then
+    the full size planet with more and more octaves. Stop iterating to skip the rest of the work,
+    e.g. when the user does not like the preview. The last planet is the same as generate_planet
+    with the same generator.
+
+    Args:
+        upp_serial (string): The universal planetary profile string.
+        width (int): Width of the finished planet image.
+        height (int): Height of the finished planet image.
+        detail (int, optional): Higher means higher frequency. Defaults to 1.
+        octaves (int, optional): Gives a fractal look. Defaults to 1.
+        rng (PlanetRng, optional): Generator for every random roll of the planet. Defaults to None.
+        spherical (bool, optional): Sample 3D noise on a sphere instead of a flat noise field.
+        Defaults to False.
+        noise_backend (str, optional): Noise backend for flat planets. Spherical planets use
+        perlin noise. Defaults to 'perlin'.
+        preview_scale (int, optional): Pixels per preview pixel in the first preview. Halved for
+        every following preview. Defaults to 4.
+        refine (bool, optional): Yield the full size planet after every octave. If False only the
+        previews and the finished planet are painted. Defaults to True.
+        indexed (bool, optional): Yield IndexedImages instead of RGBA arrays. Defaults to False.
+
+    Raises:
+        ValueError: Spherical planets can only use the perlin noise backend.
+
+    Yields:
+        tuple: (planet_array, scale, octaves) with the planet, the pixels per planet pixel and the
+        number of octaves in its noise.
+    """
+    if spherical and noise_backend != 'perlin':
+        raise ValueError(f'Spherical planets can only use the perlin noise backend. Provided: {noise_backend}')
+
+    rng = ensure_rng(rng)
+    upp_dict = upp_to_dict(upp_serial, rng)
+
+    if spherical:
+        radius = planet_radius(width, height, upp_dict['size'])
+        noise_stages = perlin.perlin_sphere_progressive(width, height, radius, detail, octaves, rng,
+                                                        preview_scale)
+    else:
+        noise_stages = perlin.perlin2d_progressive(width, height, detail, octaves, rng, preview_scale,
+                                                    noise_backend=noise_backend)
+
+    # The palette is rolled after the noise like in generate_planet and kept for every stage.
+    color_palette = None
+    for world_array, scale, stage_octaves in noise_stages:
+        if color_palette is None:
+            color_palette = create_color_palette(upp_dict, rng)
+
+        if refine or scale > 1 or stage_octaves == octaves:
+            planet_array = render_planet(world_array, upp_dict, rng, color_palette=color_palette, indexed=indexed)
+            yield planet_array, scale, stage_octaves
+
+
 def validate_universal_planetary_profile(upp_string):
-    """Takes an user provided universal planetary profile and validates it.
+    """Takes an user provided universal planetary profile and validates it with the same rules
+    as upp_to_dict and parse_upp_batch. See decode_upp_strings.
 
     Args:
         upp_string (string): String containing universal planetary profile
 
     Raises:
-        ValueError: The UPP string needs to be of length 9 or 10
-        ValueError: The UPP string needs to separate tech level with an hyphen
-        ValueError: The UPP string needs to be seven hexadecimal numbers followed by an hyphen
-        ValueError: The Upp string needs to have an integer between 0-99 after the hyphen.
+        TypeError: The UPP string needs to be of type string.
+        ValueError: The UPP string is not valid. The message tells why.
 
     Returns:
         bool: Returns true if the UPP_String passes all the validation tests.
     """
-    # If spaceport quality = X (Set it to 0)
-    upp_string = upp_string.replace('X', '0')
-
-    # Check that string length is 9 or 10 long
-    if not (len(upp_string) >= 9 and len(upp_string) <= 10):
-        raise ValueError(f"An UPP string is between 9 or 10 characters long. The string provided was {len(upp_string)} long.") 
-    elif not (upp_string[-2] == '-' or upp_string[-3] == '-'):
-        # Check that the UPP-string contains the necessary hyphen.
-        raise ValueError(f'Tech level needs to be an integer between 0-99 separated by a "-" hyphen.')
-
-    check_hexadecimal, check_integer = upp_string.split('-')
-    if not len(check_hexadecimal) == 7:
-        raise ValueError('The UPP needs to be seven hexadecimal numbers followed by a hyphen.')
-    
-    if not len(check_integer) > 0 and len(check_integer) <= 2:
-        raise ValueError('The UPP string must contain an integer of 0-99 at the end after the hyphen.')
-    
-    # Check that every number up until the hyphen is a hexadecimal.
-    # Check that technology level is entered as integer
-    int(check_hexadecimal, 16)
-    int(check_integer)
+    decode_upp(upp_string)
 
     return True
 
@@ -721,6 +1255,17 @@ def main(DEBUG_MODE = False):
     height = 500
     detail = 1
     octave = 8
+    # 'perlin', 'simplex' or 'value'. Value noise is the cheapest, simplex avoids axis aligned artifacts.
+    noise_backend = 'perlin'
+    # Sample the noise on a sphere. Only the planet disc is calculated.
+    spherical = False
+    # Show a quick low resolution preview before rendering the full planet.
+    progressive = False
+    # Save planets as palette PNGs. Uses a quarter of the memory and gives smaller files.
+    indexed = False
+
+    # Arrays reused by every planet generated in the loop. Only created when needed.
+    workspace = None
 
     # While loop
     if not DEBUG_MODE:
@@ -745,12 +1290,41 @@ def main(DEBUG_MODE = False):
         else:
             try:
                 validate_universal_planetary_profile(user_command)
-                # Generate a perlin noise array and use it create a planet
-                perlin_planet = perlin.perlin2d(width, height, detail, octave)
-                planet_array = world_image_creation(perlin_planet, user_command)
+                # Every random roll for this planet and its legend comes from one seeded generator.
+                rng = PlanetRng()
+
+                if progressive:
+                    stages = generate_planet_progressive(user_command, width, height, detail, octave, rng,
+                                                        spherical, noise_backend, refine=False,
+                                                        indexed=indexed)
+
+                    # Show the first preview and only render the full planet if the user wants it.
+                    preview_array, _, _ = next(stages)
+                    planet_to_image(preview_array).show()
+
+                    user_input = input("Would you like to render this planet? Y/n: ").lower()
+                    # Keep asking until the user provides correct input.
+                    while user_input not in ['y', 'n', '', 'yes', 'no']:
+                        user_input = input("You must enter [Y]es or [n]o").lower()
+
+                    if user_input in ['no', 'n']:
+                        continue
+
+                    # The last stage is the finished planet.
+                    for planet_array, _, _ in stages:
+                        pass
+                else:
+                    # float64 heights like perlin2d, so the bands are the same as without a workspace.
+                    if workspace == None:
+                        workspace = PlanetWorkspace(width, height, np.float64)
+
+                    # Generate a noise array and use it create a planet
+                    planet_array = generate_planet(user_command, width, height, detail, octave, rng,
+                                                    workspace, spherical, noise_backend, indexed)
+                print(f'Planet seed: {rng.seed}')
                 
                 # Generate an image from the colored array and preview it to the user.
-                planet_image = Image.fromarray(planet_array, 'RGBA')
+                planet_image = planet_to_image(planet_array)
                 planet_image.show()
 
                 # Ask if user wants to keep the image.
@@ -779,7 +1353,8 @@ def main(DEBUG_MODE = False):
                     legend_creator.generate_legend( universal_planet_profile,
                                                     geology_palette,
                                                     path,
-                                                    planet_name)
+                                                    planet_name,
+                                                    rng=rng)
             except ValueError as err:
                 print('An error occured.')
                 print(err)
@@ -0,0 +1,73 @@
+# Seeded random number generation for planets. A planet generated with the same
+# seed and UPP string will always come out the same.
+import numpy as np
+
+
+class PlanetRng:
+    """Random number generator backed by a numpy.random.Generator. Every random decision
+    made while generating a planet and its legend is drawn from one PlanetRng so the
+    planet can be recreated from its seed.
+    """
+    def __init__(self, seed: int = None):
+        """Creates the generator from a seed. If no seed is given one is drawn from the
+        operating system and stored so the planet can be recreated later.
+
+        Args:
+            seed (int, optional): A positive integer seed. Defaults to None.
+
+        Raises:
+            TypeError: seed needs to be of type int.
+            ValueError: seed can not be negative.
+        """
+        if seed == None:
+            seed = int(np.random.SeedSequence().entropy)
+        elif not isinstance(seed, int):
+            raise TypeError(f'seed needs to be of type int. Type provided: {type(seed)}')
+        elif seed < 0:
+            raise ValueError(f'seed can not be a negative number. seed provided: {seed}')
+
+        self.seed = seed
+        self.generator = np.random.default_rng(seed)
+
+    def randint(self, low: int, high: int) -> int:
+        """Returns a random integer N such that low <= N <= high.
+
+        Args:
+            low (int): Lowest possible value.
+            high (int): Highest possible value.
+
+        Returns:
+            int: The random integer.
+        """
+        return int(self.generator.integers(low, high, endpoint=True))
+
+    def choice(self, sequence):
+        """Returns a random element from a non empty sequence.
+
+        Args:
+            sequence (list, tuple): The sequence to choose from.
+
+        Returns:
+            Any: The chosen element.
+        """
+        return sequence[int(self.generator.integers(len(sequence)))]
+
+
+def ensure_rng(rng: PlanetRng = None) -> PlanetRng:
+    """Returns the provided PlanetRng or a new unseeded one if none was provided.
+
+    Args:
+        rng (PlanetRng, optional): Generator to use. Defaults to None.
+
+    Raises:
+        TypeError: rng needs to be of type PlanetRng.
+
+    Returns:
+        PlanetRng: The generator to draw random values from.
+    """
+    if rng == None:
+        rng = PlanetRng()
+    elif not isinstance(rng, PlanetRng):
+        raise TypeError(f'rng needs to be of type PlanetRng. Type provided: {type(rng)}')
+
+    return rng
@@ -0,0 +1,57 @@
+# Static Traveller tables used when drawing planets and their legends. The tables are read
+# from Data/planetary_tables.json through the data registry and can not be changed.
+from types import MappingProxyType
+import numpy as np
+from data_registry import get_data
+
+
+def int_keys(table):
+    """Creates a read-only view of a table with its number keys turned into integers.
+
+    Args:
+        table (MappingProxyType): Table with string keys. Example. {'0': ..., '1': ...}
+
+    Returns:
+        MappingProxyType: The same table keyed by integers.
+    """
+    return MappingProxyType({int(key): value for key, value in table.items()})
+
+def read_only_array(values, dtype):
+    """Creates a numpy array that can not be written to.
+
+    Args:
+        values (list): Values of the array.
+        dtype (np.dtype): Data type of the array.
+
+    Returns:
+        np.ndarray: Read-only array.
+    """
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+# Import the json-data
+planetary_tables = get_data('planetary_tables')
+
+# Starport quality -> starport letter.
+starport_letters = int_keys(planetary_tables['starport'])
+
+# Size -> diameter range in km and surface gravity.
+size_table = int_keys(planetary_tables['size'])
+
+# Atmosphere type -> description, required protective equipment and how it is drawn. Density
+# is the share of full alpha at the surface and a larger fall off keeps the atmosphere thick
+# further out. The temperature modifier is added to the 2d6 temperature roll.
+atmosphere_table = int_keys(planetary_tables['atmosphere'])
+
+# Population -> description.
+population_table = int_keys(planetary_tables['population'])
+
+# Temperature class -> minimum and maximum temperature ranges in celsius.
+temperature_table = planetary_tables['temperature']
+
+# Temperature roll modifier indexed by atmosphere type for lookups over many planets.
+atmosphere_types = sorted(atmosphere_table)
+atmosphere_temperature_modifier = read_only_array([atmosphere_table[atmosphere_type]['temperature_modifier']
+                                                    for atmosphere_type in atmosphere_types], np.int8)